@@ -0,0 +1,81 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+"""Compare the match throughput of the clean filter implementations."""
+
+import argparse
+import random
+import time
+
+from colcon_clean.clean.pattern import PatternMatcher
+from pathspec import PathSpec
+
+PATTERN_SETS = {
+    'suffix': ['*.gcda'],
+    'suffixes': ['*.o', '*.pyc', '*.gcda'],
+    'names': ['CMakeFiles/', '__pycache__'],
+    'mixed': ['*', '!.*', '!.*/', '!*.txt', '!/pkg_0/keep/'],
+}
+
+NAMES = [
+    'CMakeFiles', '__pycache__', 'lib', 'src', 'include', 'test', 'obj',
+]
+SUFFIXES = ['.o', '.gcda', '.gcno', '.pyc', '.txt', '.cmake', '.so', '']
+
+
+def generate_paths(count, seed=0):
+    """
+    Generate relative paths resembling the content of a build base.
+
+    :param count: The number of paths
+    :param seed: The seed of the random number generator
+    :rtype: list
+    """
+    rng = random.Random(seed)
+    paths = []
+    for index in range(count):
+        parts = [f'pkg_{rng.randrange(100)}']
+        parts += rng.choices(NAMES, k=rng.randrange(4))
+        parts.append(f'file_{index}{rng.choice(SUFFIXES)}')
+        paths.append('/'.join(parts))
+    return paths
+
+
+def measure(match_file, paths):
+    """
+    Measure the time to match all paths.
+
+    :param match_file: The callable matching a single path
+    :param paths: The paths
+    :returns: The number of matches and the elapsed time in seconds
+    :rtype: tuple
+    """
+    start = time.perf_counter()
+    matches = sum(1 for path in paths if match_file(path))
+    return matches, time.perf_counter() - start
+
+
+def main(argv=None):
+    """Run the benchmark and print the seconds per million paths."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--paths', type=int, default=200000,
+        help='The number of paths to match per pattern set')
+    args = parser.parse_args(argv)
+
+    paths = generate_paths(args.paths)
+    scale = 1e6 / len(paths)
+    print(f'{"patterns":<10} {"pathspec":>12} {"compiled":>12} {"speedup":>8}')
+    for name, patterns in PATTERN_SETS.items():
+        path_spec = PathSpec.from_lines('gitwildmatch', patterns)
+        matcher = PatternMatcher(patterns)
+        expected, baseline = measure(path_spec.match_file, paths)
+        matches, elapsed = measure(matcher.match_file, paths)
+        assert matches == expected, (name, matches, expected)
+        print(
+            f'{name:<10} {baseline * scale:>10.2f} s '
+            f'{elapsed * scale:>10.2f} s {baseline / elapsed:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+"""Measure the startup cost colcon-clean adds to other colcon verbs."""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# block the verb entry point to measure colcon as if the package is missing
+BLOCKLIST_ENTRY = 'colcon_core.verb.clean'
+
+COLCON = [
+    sys.executable, '-c',
+    'import sys; from colcon_core.command import main; sys.exit(main())']
+
+# print the imported colcon-clean modules once colcon exits
+LIST_MODULES = """
+import sys
+from colcon_core.command import main
+try:
+    main()
+except SystemExit:
+    pass
+sys.__stderr__.write('\\n'.join(
+    name for name in sorted(sys.modules) if name.startswith('colcon_clean')))
+"""
+
+
+def get_env(*, blocked):
+    """
+    Get the environment of a colcon invocation.
+
+    :param blocked: Flag if the clean verb should be blocked
+    :rtype: dict
+    """
+    env = dict(os.environ)
+    blocklist = [
+        entry for entry in env.get('COLCON_EXTENSION_BLOCKLIST', '')
+        .split(os.pathsep) if entry]
+    if blocked:
+        blocklist.append(BLOCKLIST_ENTRY)
+    env['COLCON_EXTENSION_BLOCKLIST'] = os.pathsep.join(blocklist)
+    return env
+
+
+def measure_command(arguments, *, blocked, repeat):
+    """
+    Measure the wall time of colcon invocations.
+
+    :param arguments: The colcon arguments
+    :param blocked: Flag if the clean verb should be blocked
+    :param repeat: The number of invocations
+    :returns: The wall times in seconds
+    :rtype: list
+    """
+    env = get_env(blocked=blocked)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            COLCON + arguments, env=env, check=True,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+# measure importing the verb module on top of what colcon imports anyway
+IMPORT_VERB = """
+import sys
+import time
+import colcon_core.command
+start = time.perf_counter()
+import colcon_clean.verb.clean
+sys.stdout.write(str(time.perf_counter() - start))
+"""
+
+
+def measure_verb_import(*, repeat):
+    """
+    Measure the time to import the clean verb module.
+
+    :param repeat: The number of measurements
+    :returns: The import times in seconds
+    :rtype: list
+    """
+    return [
+        float(subprocess.run(
+            [sys.executable, '-c', IMPORT_VERB], check=True,
+            stdout=subprocess.PIPE, universal_newlines=True).stdout)
+        for _ in range(repeat)]
+
+
+def get_imported_modules(arguments):
+    """
+    Get the colcon-clean modules imported by a colcon invocation.
+
+    :param arguments: The colcon arguments
+    :rtype: list
+    """
+    result = subprocess.run(
+        [sys.executable, '-c', LIST_MODULES] + arguments,
+        env=get_env(blocked=False), check=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    return result.stderr.split()
+
+
+def main(argv=None):
+    """Run the benchmark and print the median startup times."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--repeat', type=int, default=10,
+        help='The number of invocations per variant')
+    parser.add_argument(
+        'arguments', nargs='*', default=['build', '--help'],
+        help='The colcon arguments (default: build --help)')
+    args = parser.parse_args(argv)
+
+    # warm up the file system caches
+    measure_command(args.arguments, blocked=False, repeat=1)
+
+    without = statistics.median(measure_command(
+        args.arguments, blocked=True, repeat=args.repeat))
+    with_clean = statistics.median(measure_command(
+        args.arguments, blocked=False, repeat=args.repeat))
+    print(f'colcon {" ".join(args.arguments)}')
+    print(f'{"without colcon-clean":<24} {without * 1e3:>8.1f} ms')
+    print(f'{"with colcon-clean":<24} {with_clean * 1e3:>8.1f} ms')
+    print(f'{"difference":<24} {(with_clean - without) * 1e3:>8.1f} ms')
+    verb_import = statistics.median(measure_verb_import(repeat=args.repeat))
+    print(f'{"import of clean verb":<24} {verb_import * 1e3:>8.1f} ms')
+    print('Imported colcon-clean modules:')
+    for name in get_imported_modules(args.arguments):
+        print(f'    {name}')
+
+
+if __name__ == '__main__':
+    main()
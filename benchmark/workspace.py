@@ -0,0 +1,275 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+"""Measure scanning and cleaning of a generated workspace."""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+from pathlib import Path
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from colcon_clean.clean.argument_type import size
+from colcon_clean.clean.scan import ScanFilter
+from colcon_clean.subverb import get_match_patterns
+from colcon_clean.subverb import scan_directory
+from colcon_core.command import main as colcon_main
+
+BASES = ('build', 'install')
+
+SUFFIXES = ['.o', '.gcda', '.gcno', '.pyc', '.txt', '.cmake', '.so', '']
+
+FILTERS = {
+    'suffix': {'match': ['*.o']},
+    'suffixes': {'match': ['*.o', '*.gcda', '*.pyc']},
+    'ignore': {'ignore': ['*.txt', '.*', '.*/']},
+}
+
+CLEANS = {
+    'workspace': ['workspace'],
+    'workspace_suffix': ['workspace', '--clean-match', '*.o'],
+    'packages': ['packages'],
+    'packages_suffix': ['packages', '--clean-match', '*.o'],
+}
+
+
+def generate_workspace(
+    root, *, packages, files, depth, symlink_ratio, file_size, seed=0,
+):
+    """
+    Generate a workspace with built packages.
+
+    Each package has a source directory which colcon identifies as a Python
+    package and a directory in each base. The files of a package are spread
+    over a tree of directories with the given depth and a fraction of them
+    are symbolic links to the sources.
+
+    :param root: The workspace directory
+    :param packages: The number of packages
+    :param files: The number of files per package and base
+    :param depth: The number of nested directories below a package
+    :param symlink_ratio: The fraction of files which are symbolic links
+    :param file_size: The number of bytes of each regular file
+    :param seed: The seed of the random number generator
+    :returns: The number of generated files
+    :rtype: int
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    content = b'\0' * file_size
+    count = 0
+    for pkg_index in range(packages):
+        pkg_name = f'pkg_{pkg_index}'
+        src_path = root / 'src' / pkg_name
+        src_path.mkdir(parents=True, exist_ok=True)
+        (src_path / 'setup.cfg').write_text(
+            f'[metadata]\nname = {pkg_name}\n')
+        (src_path / 'setup.py').write_text(
+            'from setuptools import setup\nsetup()\n')
+        for base in BASES:
+            for index in range(files):
+                parts = [
+                    f'dir_{(index // 4 ** level) % 4}'
+                    for level in range(depth)]
+                path = root.joinpath(base, pkg_name, *parts)
+                path.mkdir(parents=True, exist_ok=True)
+                path /= f'file_{index}{rng.choice(SUFFIXES)}'
+                if rng.random() < symlink_ratio:
+                    os.symlink(src_path / 'setup.py', path)
+                else:
+                    path.write_bytes(content)
+                count += 1
+    return count
+
+
+def get_scan_filter(name):
+    """
+    Get the scan filter of a named filter, `None` for a plain scan.
+
+    :param name: The key of :data:`FILTERS` or `None`
+    :rtype: ScanFilter
+    """
+    if name is None:
+        return None
+    return ScanFilter(match=get_match_patterns(**FILTERS[name]))
+
+
+def measure_scan(root, filter_name):
+    """
+    Measure scanning the bases of a workspace.
+
+    :param root: The workspace directory
+    :param filter_name: The key of :data:`FILTERS` or `None`
+    :returns: The number of found paths and the elapsed time in seconds
+    :rtype: tuple
+    """
+    start = time.perf_counter()
+    scan_filter = get_scan_filter(filter_name)
+    count = 0
+    for base in BASES:
+        for _ in scan_directory(Path(root, base).absolute(), scan_filter):
+            count += 1
+    return count, time.perf_counter() - start
+
+
+def measure_clean(root, arguments):
+    """
+    Measure cleaning a workspace with the `clean` verb.
+
+    :param root: The workspace directory
+    :param arguments: The subverb and its arguments
+    :returns: The elapsed time in seconds
+    :rtype: float
+    """
+    argv = ['--log-base', os.devnull, 'clean'] + arguments + [
+        '--yes', '--base-select'] + list(BASES)
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            rc = colcon_main(argv=argv)
+            elapsed = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+    assert not rc, (arguments, rc)
+    return elapsed
+
+
+def compare_results(results, baseline, tolerance):
+    """
+    Find the cases which are slower than in a previous run.
+
+    :param results: The results of this run
+    :param baseline: The results of the previous run
+    :param tolerance: The fraction by which a case may be slower
+    :returns: The names of the regressed cases
+    :rtype: list
+    """
+    previous = {result['case']: result['seconds'] for result in baseline}
+    return [
+        result['case'] for result in results
+        if result['case'] in previous and
+        result['seconds'] > previous[result['case']] * (1 + tolerance)]
+
+
+def main(argv=None):
+    """Run the benchmark and print or store the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--packages', type=int, default=20,
+        help='The number of packages')
+    parser.add_argument(
+        '--files', type=int, default=500,
+        help='The number of files per package and base')
+    parser.add_argument(
+        '--depth', type=int, default=3,
+        help='The number of nested directories below a package')
+    parser.add_argument(
+        '--symlink-ratio', type=float, default=0.1,
+        help='The fraction of files which are symbolic links')
+    parser.add_argument(
+        '--file-size', type=size, default=0,
+        help='The size of each regular file, e.g. 4K')
+    parser.add_argument(
+        '--repeat', type=int, default=3,
+        help='The number of runs per case, the fastest one is reported')
+    parser.add_argument(
+        '--output', type=Path, default=None,
+        help='The path of the JSON file to store the results in')
+    parser.add_argument(
+        '--baseline', type=Path, default=None,
+        help='The path of the JSON file of a previous run to compare with')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.2,
+        help='The fraction by which a case may be slower than the baseline')
+    args = parser.parse_args(argv)
+
+    parameters = {
+        'packages': args.packages,
+        'files': args.files,
+        'depth': args.depth,
+        'symlink_ratio': args.symlink_ratio,
+        'file_size': args.file_size,
+        'repeat': args.repeat,
+    }
+    # isolate the benchmark from user configuration
+    home = tempfile.mkdtemp(prefix='colcon_clean_benchmark_home_')
+    os.environ['COLCON_HOME'] = home
+    os.environ['COLCON_DEFAULTS_FILE'] = os.path.join(home, 'defaults.yaml')
+    os.environ['COLCON_EXTENSION_BLOCKLIST'] = \
+        'colcon_core.event_handler.desktop_notification'
+
+    results = []
+    root = tempfile.mkdtemp(prefix='colcon_clean_benchmark_')
+    try:
+        generated = generate_workspace(
+            root, packages=args.packages, files=args.files,
+            depth=args.depth, symlink_ratio=args.symlink_ratio,
+            file_size=args.file_size)
+        for filter_name in [None] + list(FILTERS.keys()):
+            timings = [
+                measure_scan(root, filter_name) for _ in range(args.repeat)]
+            results.append({
+                'case': f'scan_{filter_name or "plain"}',
+                'paths': timings[0][0],
+                'seconds': min(elapsed for _, elapsed in timings),
+            })
+        for name, arguments in CLEANS.items():
+            timings = []
+            for _ in range(args.repeat):
+                shutil.rmtree(root)
+                generate_workspace(
+                    root, packages=args.packages, files=args.files,
+                    depth=args.depth, symlink_ratio=args.symlink_ratio,
+                    file_size=args.file_size)
+                timings.append(measure_clean(root, arguments))
+            results.append({
+                'case': f'clean_{name}',
+                'paths': None,
+                'seconds': min(timings),
+            })
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+        shutil.rmtree(home, ignore_errors=True)
+
+    data = {
+        'parameters': parameters,
+        'files': generated,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    if args.output:
+        with args.output.open('w') as h:
+            json.dump(data, h, indent=2)
+            h.write('\n')
+    print(f'{"case":<24} {"paths":>8} {"seconds":>10}', file=sys.stderr)
+    for result in results:
+        paths = '' if result['paths'] is None else result['paths']
+        print(
+            f'{result["case"]:<24} {paths:>8} {result["seconds"]:>10.3f}',
+            file=sys.stderr)
+    if not args.output:
+        print(json.dumps(data, indent=2))
+
+    if args.baseline:
+        with args.baseline.open('r') as h:
+            baseline = json.load(h)
+        if baseline['parameters'] != parameters:
+            return 'The parameters differ from the baseline'
+        regressions = compare_results(
+            results, baseline['results'], args.tolerance)
+        if regressions:
+            return 'Regressed cases: ' + ', '.join(regressions)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,24 @@
 # Copyright 2021 Ruffin White
 # Licensed under the Apache License, Version 2.0
 
+import datetime
+import os
+import re
+
 from colcon_clean.base_handler import BaseHandlerExtensionPoint
+from colcon_clean.clean.argument_type import duration
+from colcon_clean.clean.argument_type import positive_int
+from colcon_core.location import get_log_path
 from colcon_core.plugin_system import satisfies_version
 
 BASE_PATH = 'log'
 
+# the log directory of each invocation is named <verb>_<timestamp>
+# runs started within the same second get a suffix like `_2`
+RUN_DIRNAME_PATTERN = re.compile(
+    r'(?:.+_)?(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})(?:_(\d+))?')
+RUN_TIMESTAMP_FORMAT = '%Y-%m-%d_%H-%M-%S'
+
 
 class LogBaseHandler(BaseHandlerExtensionPoint):
     """Determin how log paths for the workspace should be cleaned."""
@@ -21,9 +34,75 @@ class LogBaseHandler(BaseHandlerExtensionPoint):
             default=self.base_path,
             help='The base path for all log directories '
                  f'(default: {self.base_path})')
+        parser.add_argument(
+            '--log-keep-last',
+            type=positive_int,
+            default=None,
+            metavar='N',
+            help='Only clean log directories of runs older than the last N '
+                 'runs')
+        parser.add_argument(
+            '--log-older-than',
+            type=duration,
+            default=None,
+            metavar='DURATION',
+            help='Only clean log directories of runs older than the given '
+                 'duration, e.g. 12h or 7d')
 
     def get_workspace_paths(self, *, args):  # noqa: D102
-        return [args.log_base]
+        if args.log_keep_last is None and args.log_older_than is None:
+            return [args.log_base]
+        # never clean the log directory of the current invocation
+        current_log_path = get_log_path()
+        return get_expired_run_paths(
+            args.log_base, keep_last=args.log_keep_last,
+            older_than=args.log_older_than,
+            exclude=current_log_path.name if current_log_path else None)
 
     def get_package_paths(self, *, args, pkg):  # noqa: D102
         return []
+
+
+def get_expired_run_paths(
+    log_base, *, keep_last=None, older_than=None, exclude=None
+):
+    """
+    Get the log directories of runs outside of the retention policy.
+
+    The age of each run is determined from the timestamp in the directory
+    name, so only a single listing of the log base is necessary. A run is
+    retained if it is one of the last `keep_last` runs or if it is newer than
+    `older_than`. Any other entries, e.g. the `latest` symlinks, are never
+    returned.
+
+    :param log_base: The log base path
+    :param keep_last: The number of most recent runs to keep
+    :param older_than: The `datetime.timedelta` of runs to keep
+    :param exclude: The name of a run directory to ignore
+    :rtype: list
+    """
+    runs = []
+    try:
+        with os.scandir(log_base) as entries:
+            for entry in entries:
+                if entry.name == exclude:
+                    continue
+                match = RUN_DIRNAME_PATTERN.fullmatch(entry.name)
+                if match is None or not entry.is_dir(follow_symlinks=False):
+                    continue
+                try:
+                    timestamp = datetime.datetime.strptime(
+                        match.group(1), RUN_TIMESTAMP_FORMAT)
+                except ValueError:
+                    continue
+                runs.append((timestamp, int(match.group(2) or 1), entry.name))
+    except FileNotFoundError:
+        return []
+    runs.sort(reverse=True)
+
+    if keep_last is not None:
+        runs = runs[keep_last:]
+    if older_than is not None:
+        cutoff = datetime.datetime.now() - older_than
+        runs = [run for run in runs if run[0] < cutoff]
+    return [os.path.join(log_base, name) for _, _, name in runs]
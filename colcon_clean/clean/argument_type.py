@@ -0,0 +1,72 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import argparse
+import datetime
+import re
+
+DURATION_UNITS = {
+    's': 'seconds',
+    'm': 'minutes',
+    'h': 'hours',
+    'd': 'days',
+    'w': 'weeks',
+}
+
+SIZE_UNITS = {
+    '': 1,
+    'K': 1024,
+    'M': 1024 ** 2,
+    'G': 1024 ** 3,
+    'T': 1024 ** 4,
+}
+
+
+def positive_int(value):
+    """
+    Parse a strictly positive integer argument.
+
+    :param value: The string value passed on the command line
+    :rtype: int
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid integer value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            f"value must be a positive integer: '{value}'")
+    return number
+
+
+def duration(value):
+    """
+    Parse a duration argument like `90m`, `12h` or `7d`.
+
+    :param value: The string value passed on the command line
+    :rtype: datetime.timedelta
+    """
+    match = re.fullmatch(r'(\d+)([smhdw])', value.strip())
+    if match is None:
+        raise argparse.ArgumentTypeError(
+            f"invalid duration value: '{value}' (expected e.g. 12h or 7d)")
+    number, unit = match.groups()
+    return datetime.timedelta(**{DURATION_UNITS[unit]: int(number)})
+
+
+def size(value):
+    """
+    Parse a size argument like `512M` or `50G` using binary multiples.
+
+    :param value: The string value passed on the command line
+    :returns: The number of bytes
+    :rtype: int
+    """
+    match = re.fullmatch(
+        r'(\d+(?:\.\d+)?)\s*([KMGT]?)(?:i?B)?', value.strip(), re.IGNORECASE)
+    if match is None:
+        raise argparse.ArgumentTypeError(
+            f"invalid size value: '{value}' (expected e.g. 512M or 50G)")
+    number, unit = match.groups()
+    return int(float(number) * SIZE_UNITS[unit.upper()])
@@ -0,0 +1,59 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import os
+
+from colcon_core.logging import colcon_logger
+
+logger = colcon_logger.getChild(__name__)
+
+BUILD_MARKER = 'colcon_build.rc'
+
+
+def get_last_build_time(build_base, pkg_name):
+    """
+    Get the time a package was last built.
+
+    The time is determined from the modification time of the marker file
+    colcon writes into the build directory of each package.
+
+    :param build_base: The base path for all build directories
+    :param pkg_name: The package name
+    :returns: The timestamp or `None` if the package has not been built
+    :rtype: float
+    """
+    try:
+        return os.stat(
+            os.path.join(build_base, pkg_name, BUILD_MARKER)).st_mtime
+    except OSError:
+        return None
+
+
+def select_packages_to_evict(package_sizes, last_build_times, max_size):
+    """
+    Select the least recently built packages to fit a disk budget.
+
+    Packages without a last build time are evicted first, followed by the
+    packages in the order they were built. Ties are broken by package name.
+
+    :param package_sizes: The mapping of package names to the number of
+      bytes freed by cleaning them
+    :param last_build_times: The mapping of package names to their last
+      build time or `None`
+    :param max_size: The maximum number of bytes to keep
+    :returns: The names of the packages to evict
+    :rtype: list
+    """
+    total = sum(package_sizes.values())
+    evicted = []
+    for pkg_name in sorted(
+        package_sizes.keys(),
+        key=lambda name: (
+            last_build_times.get(name) is not None,
+            last_build_times.get(name) or 0, name),
+    ):
+        if total <= max_size:
+            break
+        evicted.append(pkg_name)
+        total -= package_sizes[pkg_name]
+    return evicted
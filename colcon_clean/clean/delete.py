@@ -0,0 +1,502 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import errno
+import os
+from pathlib import Path
+import queue
+import shutil
+import threading
+
+from colcon_clean.clean.device import get_device
+from colcon_clean.clean.device import get_mount_points
+from colcon_clean.clean.device import get_network_devices
+from colcon_clean.clean.device import NETWORK_WORKERS_FACTOR
+from colcon_clean.clean.plan import sorted_paths
+from colcon_core.logging import colcon_logger
+
+logger = colcon_logger.getChild(__name__)
+
+# open directories without following symbolic links, which fails with
+# ENOTDIR for other files and with ELOOP for symbolic links
+_DIR_FLAGS = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0) | \
+    getattr(os, 'O_NOFOLLOW', 0) | getattr(os, 'O_CLOEXEC', 0)
+_NOT_A_DIR_ERRNOS = (errno.ENOTDIR, errno.ELOOP)
+
+_LANE_DONE = object()
+
+_USE_FD_FUNCTIONS = (
+    hasattr(os, 'O_DIRECTORY') and hasattr(os, 'O_NOFOLLOW') and
+    {os.open, os.rmdir, os.unlink} <= os.supports_dir_fd and
+    os.scandir in os.supports_fd)
+
+
+class CleanSummary:
+    """The outcome of cleaning a collection of paths."""
+
+    def __init__(self):  # noqa: D107
+        self.cleaned = 0
+        self.errors = []
+
+    def start(self, path):
+        """
+        Record that cleaning a single path has started.
+
+        :param path: The path which is being cleaned
+        """
+        pass
+
+    def add(self, path, errors):
+        """
+        Record the outcome of cleaning a single path.
+
+        :param path: The path which was cleaned
+        :param errors: The list of `(path, exception)` tuples collected while
+          cleaning the path
+        """
+        if errors:
+            self.errors.extend(errors)
+        else:
+            self.cleaned += 1
+
+    def finish(self):
+        """Record that cleaning all paths has finished."""
+        pass
+
+
+class ObservedSummary:
+    """
+    A clean summary which additionally notifies observers of each outcome.
+
+    The outcome is recorded in the wrapped clean summary, while the `add`
+    method of every observer is called with the same arguments, e.g. to
+    journal the cleaned paths.
+    """
+
+    def __init__(self, summary, observers):  # noqa: D107
+        self.summary = summary
+        self._observers = list(observers)
+
+    @property
+    def cleaned(self):  # noqa: D102
+        return self.summary.cleaned
+
+    @property
+    def errors(self):  # noqa: D102
+        return self.summary.errors
+
+    def start(self, path):  # noqa: D102
+        self.summary.start(path)
+
+    def add(self, path, errors):  # noqa: D102
+        self.summary.add(path, errors)
+        for observer in self._observers:
+            observer.add(path, errors)
+
+    def finish(self):  # noqa: D102
+        self.summary.finish()
+
+
+def get_default_workers():
+    """
+    Get the default number of concurrent deletion workers.
+
+    :rtype: int
+    """
+    return os.cpu_count() or 1
+
+
+def delete_paths(paths, *, workers=None, summary=None, network_workers=None):
+    """
+    Delete paths using a bounded pool of workers per device.
+
+    The paths are processed in sorted order and at most a small multiple of
+    the number of workers are pending at any time, which keeps the outcome
+    deterministic and the memory usage independent of the number of paths.
+
+    The paths on each device are deleted by a separate pool, so that slow
+    deletions on one device, e.g. on a network file system, don't hold up
+    the deletions on other devices. The paths are passed to the pool of
+    their device as they are iterated, so a :class:`PathPlan` is never
+    expanded into a list of all paths. The device is only looked up once
+    for consecutive paths within the same directory, except for mount
+    points, which reside on a different device than their directory.
+
+    :param paths: The paths to delete
+    :param workers: The number of concurrent workers per device, `None` to
+      use the number of CPUs
+    :param summary: The clean summary to record the outcome in, `None` to
+      create a new one
+    :param network_workers: The number of concurrent workers per network
+      file system, `None` to use a multiple of `workers`
+    :rtype: CleanSummary
+    """
+    if workers is None:
+        workers = get_default_workers()
+    if network_workers is None:
+        network_workers = workers * NETWORK_WORKERS_FACTOR
+    if summary is None:
+        summary = CleanSummary()
+    network_devices = get_network_devices()
+    mount_points = get_mount_points()
+
+    results = queue.Queue()
+    lanes = {}
+    failures = []
+
+    def process_results(block):
+        while True:
+            try:
+                path, errors = results.get(block=block, timeout=0.1)
+            except queue.Empty:
+                return
+            if path is _LANE_DONE:
+                if errors is not None:
+                    failures.append(errors)
+            elif errors is None:
+                summary.start(path)
+            else:
+                summary.add(path, errors)
+            block = False
+
+    try:
+        directory = device = None
+        for path in sorted_paths(paths):
+            if str(path) in mount_points:
+                device = get_device(path)
+                directory = None
+            elif path.parent != directory:
+                directory = path.parent
+                device = get_device(directory)
+            lane = lanes.get(device)
+            if lane is None:
+                lane_workers = \
+                    network_workers if device in network_devices else workers
+                logger.debug(
+                    f'Deleting paths on device {device} using {lane_workers} '
+                    'workers')
+                lane = lanes[device] = _DeviceLane(lane_workers, results)
+            while not lane.put(path):
+                process_results(block=False)
+                if failures:
+                    break
+            if failures:
+                break
+            process_results(block=False)
+        for lane in lanes.values():
+            while not lane.put(_LANE_DONE):
+                process_results(block=False)
+        while any(lane.is_alive() for lane in lanes.values()):
+            process_results(block=True)
+        process_results(block=False)
+    except BaseException:  # noqa: B902
+        # e.g. a KeyboardInterrupt, stop the lanes once their deletions in
+        # progress are done instead of waiting for further paths forever
+        for lane in lanes.values():
+            lane.cancel()
+        for lane in lanes.values():
+            lane.join()
+        raise
+    if failures:
+        raise failures[0]
+    summary.finish()
+    summary.errors.sort(key=lambda error: str(error[0]))
+    return summary
+
+
+class _DeviceLane:
+    """A thread deleting the paths of a single device as they are put."""
+
+    def __init__(self, workers, results):
+        self._queue = queue.Queue(maxsize=workers * 4)
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(
+            target=_delete_lane, args=(self._get_paths(), workers, results))
+        self._thread.start()
+
+    def _get_paths(self):
+        while not self._cancelled.is_set():
+            try:
+                path = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if path is _LANE_DONE:
+                return
+            yield path
+
+    def put(self, path):
+        # give up once the lane stopped consuming, e.g. after a failure
+        try:
+            self._queue.put(path, timeout=0.1)
+        except queue.Full:
+            return not self._thread.is_alive()
+        return True
+
+    def cancel(self):
+        # stop taking further paths even if the done marker is never put
+        self._cancelled.set()
+
+    def join(self):
+        self._thread.join()
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+
+def _delete_lane(paths, workers, results):
+    # report to the calling thread which records the outcome in the summary
+    failure = None
+    try:
+        _delete_bounded(
+            paths, workers,
+            started=lambda path: results.put((path, None)),
+            finished=lambda path, errors: results.put((path, errors)))
+    except Exception as e:  # noqa: B902
+        failure = e
+    finally:
+        results.put((_LANE_DONE, failure))
+
+
+def delete_stream(paths, *, workers=None, summary=None):
+    """
+    Delete paths in the order they are produced.
+
+    In contrast to :func:`delete_paths` the paths are not collected upfront,
+    so the deletion can start while the paths are still being produced.
+    All paths are deleted by the same pool of workers.
+
+    :param paths: The iterable of paths to delete
+    :param workers: The number of concurrent workers, `None` to use the
+      number of CPUs
+    :param summary: The clean summary to record the outcome in, `None` to
+      create a new one
+    :rtype: CleanSummary
+    """
+    if workers is None:
+        workers = get_default_workers()
+    if summary is None:
+        summary = CleanSummary()
+    _delete_bounded(
+        paths, workers, started=summary.start, finished=summary.add)
+    summary.finish()
+    summary.errors.sort(key=lambda error: str(error[0]))
+    return summary
+
+
+def _delete_bounded(paths, workers, *, started, finished):
+    # the subdirectories of each path are deleted as separate tasks, so the
+    # workers are also used for a few large paths, e.g. the bases of a
+    # workspace, and the emptied path is only removed once they are done
+    pending = deque()
+
+    def finish(path, future):
+        errors, subdirectory_futures = future.result()
+        for subdirectory_future in subdirectory_futures:
+            errors.extend(subdirectory_future.result())
+        if subdirectory_futures:
+            try:
+                os.rmdir(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                errors.append((path, e))
+        finished(path, errors)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for path in paths:
+            started(path)
+            pending.append((path, executor.submit(
+                _delete_path_split, path, executor.submit)))
+            if len(pending) >= workers * 4:
+                finish(*pending.popleft())
+        while pending:
+            finish(*pending.popleft())
+
+
+def _delete_path_split(path, submit):
+    # delete the files of a directory, but submit its subdirectories
+    if not _USE_FD_FUNCTIONS:  # pragma: no cover
+        return delete_path(path), []
+    logger.info(f"Cleaning path: '{path}'")
+    errors = []
+    try:
+        fd = os.open(path, _DIR_FLAGS)
+    except FileNotFoundError:
+        return errors, []
+    except OSError as e:
+        if e.errno in _NOT_A_DIR_ERRNOS:
+            _unlink(path, None, path, errors)
+        else:
+            errors.append((path, e))
+        return errors, []
+    dirpath = str(path)
+    futures = []
+    try:
+        with os.scandir(fd) as entries:
+            entries = list(entries)
+    except OSError as e:
+        errors.append((dirpath, e))
+        entries = []
+    try:
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                is_dir = False
+            if is_dir:
+                futures.append(submit(
+                    _delete_tree, os.path.join(dirpath, entry.name)))
+            else:
+                _unlink(entry.name, fd, dirpath, errors)
+    finally:
+        os.close(fd)
+    if not futures:
+        try:
+            os.rmdir(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            errors.append((path, e))
+    return errors, futures
+
+
+def delete_path(path):
+    """
+    Delete a single file or directory tree.
+
+    Errors are collected instead of being raised, so that one path which can
+    not be removed doesn't prevent the removal of all other paths.
+
+    Where the platform supports it, directories are deleted relative to open
+    directory file descriptors. The type of each entry is taken from the
+    directory listing, so entries are not stat'ed again and the full path of
+    a nested entry is only built to report a failure.
+
+    :param path: The path to delete
+    :returns: The list of `(path, exception)` tuples for all failures
+    :rtype: list
+    """
+    logger.info(f"Cleaning path: '{path}'")
+    return _delete_tree(path)
+
+
+def _delete_tree(path):
+    errors = []
+    if not _USE_FD_FUNCTIONS:  # pragma: no cover
+        _delete_path_fallback(path, errors)
+        return errors
+
+    try:
+        fd = os.open(path, _DIR_FLAGS)
+    except FileNotFoundError:
+        return errors
+    except OSError as e:
+        if e.errno in _NOT_A_DIR_ERRNOS:
+            _unlink(path, None, path, errors)
+        else:
+            errors.append((path, e))
+        return errors
+    try:
+        _delete_contents(fd, str(path), errors)
+    finally:
+        os.close(fd)
+    try:
+        os.rmdir(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        errors.append((path, e))
+    return errors
+
+
+def _delete_contents(dir_fd, dirpath, errors):
+    try:
+        with os.scandir(dir_fd) as entries:
+            entries = list(entries)
+    except OSError as e:
+        errors.append((dirpath, e))
+        return
+    for entry in entries:
+        name = entry.name
+        try:
+            # only stats the entry if the listing doesn't provide the type
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            is_dir = False
+        if is_dir:
+            try:
+                fd = os.open(name, _DIR_FLAGS, dir_fd=dir_fd)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                if e.errno not in _NOT_A_DIR_ERRNOS:
+                    errors.append((os.path.join(dirpath, name), e))
+                    continue
+                # replaced by another file since the listing
+            else:
+                try:
+                    _delete_contents(
+                        fd, os.path.join(dirpath, name), errors)
+                finally:
+                    os.close(fd)
+                try:
+                    os.rmdir(name, dir_fd=dir_fd)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    errors.append((os.path.join(dirpath, name), e))
+                continue
+        _unlink(name, dir_fd, dirpath, errors)
+
+
+def _unlink(name, dir_fd, dirpath, errors):
+    try:
+        os.unlink(name, dir_fd=dir_fd)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        path = dirpath if dir_fd is None else os.path.join(dirpath, name)
+        errors.append((path, e))
+
+
+def _delete_path_fallback(path, errors):
+    path = Path(path)
+
+    def onexc(func, failed_path, exc):
+        if not isinstance(exc, FileNotFoundError):
+            errors.append((failed_path, exc))
+
+    def onerror(func, failed_path, excinfo):
+        onexc(func, failed_path, excinfo[1])
+
+    try:
+        if path.is_dir() and not path.is_symlink():
+            try:
+                shutil.rmtree(path, onexc=onexc)
+            except TypeError:
+                # TODO: Remove when minimum python version is 3.12
+                shutil.rmtree(path, onerror=onerror)
+        else:
+            path.unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        errors.append((path, e))
+
+
+def log_summary(summary):
+    """
+    Report the outcome of cleaning paths.
+
+    :param summary: The clean summary
+    """
+    for path, exc in summary.errors:
+        logger.warning(f"Skipping path: '{path}'")
+        logger.info(f"Skipping info: '{exc}'")
+    message = f'Cleaned {summary.cleaned} paths'
+    if summary.errors:
+        message += f' with {len(summary.errors)} errors'
+    logger.info(message)
+    print(message)
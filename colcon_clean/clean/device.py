@@ -0,0 +1,99 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import os
+import re
+
+from colcon_core.logging import colcon_logger
+
+logger = colcon_logger.getChild(__name__)
+
+MOUNTINFO_PATH = '/proc/self/mountinfo'
+
+# the octal escapes of characters in the fields of the mount information
+_OCTAL_ESCAPE = re.compile(r'\\([0-7]{3})')
+
+# file system types where each operation is a round trip over the network
+NETWORK_FILESYSTEM_TYPES = {
+    '9p', 'afs', 'beegfs', 'ceph', 'cifs', 'fuse.sshfs', 'glusterfs',
+    'fuse.glusterfs', 'gpfs', 'lustre', 'ncpfs', 'nfs', 'nfs4', 'smb3',
+    'smbfs',
+}
+
+# the factor of workers per device for network file systems, since their
+# deletions are bound by the latency rather than the local resources
+NETWORK_WORKERS_FACTOR = 4
+
+
+def get_device(path):
+    """
+    Get the device a path resides on.
+
+    :param path: The path
+    :returns: The device number or `None` if the path doesn't exist
+    """
+    try:
+        return os.lstat(path).st_dev
+    except OSError:
+        return None
+
+
+def get_network_devices(mountinfo_path=MOUNTINFO_PATH):
+    """
+    Get the devices of the mounted network file systems.
+
+    The mounts are read from the mount information of the process, which is
+    only available on Linux.
+
+    :param mountinfo_path: The path of the mount information
+    :returns: The device numbers
+    :rtype: set
+    """
+    devices = set()
+    for fields, other in _read_mountinfo(mountinfo_path):
+        if other[0] not in NETWORK_FILESYSTEM_TYPES:
+            continue
+        major, _, minor = fields[2].partition(':')
+        try:
+            devices.add(os.makedev(int(major), int(minor)))
+        except ValueError:
+            continue
+    return devices
+
+
+def get_mount_points(mountinfo_path=MOUNTINFO_PATH):
+    """
+    Get the paths where file systems are mounted.
+
+    The mounts are read from the mount information of the process, which is
+    only available on Linux.
+
+    :param mountinfo_path: The path of the mount information
+    :returns: The mount points
+    :rtype: set
+    """
+    mount_points = set()
+    for fields, _ in _read_mountinfo(mountinfo_path):
+        if len(fields) < 5:
+            continue
+        # white space and backslashes are escaped as octal numbers
+        mount_points.add(_OCTAL_ESCAPE.sub(
+            lambda match: chr(int(match.group(1), 8)), fields[4]))
+    return mount_points
+
+
+def _read_mountinfo(mountinfo_path):
+    try:
+        with open(mountinfo_path, 'r') as h:
+            lines = h.read().splitlines()
+    except OSError as e:
+        logger.debug(f'Failed to read mount information: {e}')
+        return
+    for line in lines:
+        # the optional fields are terminated by a single hyphen
+        fields, _, other = line.partition(' - ')
+        fields = fields.split()
+        other = other.split()
+        if len(fields) < 3 or not other:
+            continue
+        yield fields, other
@@ -0,0 +1,197 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+from collections import OrderedDict
+import time
+
+from colcon_clean.clean.delete import CleanSummary
+from colcon_core.event.job import JobEnded
+from colcon_core.event.job import JobProgress
+from colcon_core.event.job import JobStarted
+from colcon_core.executor import Job
+from colcon_core.task import TaskContext
+
+# the identifier of the job for paths without a base and package
+DEFAULT_JOB_IDENTIFIER = 'clean'
+
+# the minimum number of seconds between progress events of the same job
+PROGRESS_INTERVAL = 0.5
+
+
+class CleanScanned:
+    """An event containing the number of paths found for a job."""
+
+    __slots__ = ('identifier', 'paths', 'duration')
+
+    def __init__(self, identifier, paths, duration):
+        """
+        Construct a CleanScanned.
+
+        :param str identifier: The job identifier
+        :param int paths: The number of paths found
+        :param float duration: The number of seconds spent scanning
+        """
+        self.identifier = identifier
+        self.paths = paths
+        self.duration = duration
+
+
+class CleanEnded:
+    """An event containing the outcome of cleaning the paths of a job."""
+
+    __slots__ = ('identifier', 'paths', 'files', 'size', 'errors', 'duration')
+
+    def __init__(self, identifier, paths, files, size, errors, duration):
+        """
+        Construct a CleanEnded.
+
+        :param str identifier: The job identifier
+        :param int paths: The number of cleaned paths
+        :param files: The number of removed files, `None` if not measured
+        :param size: The number of removed bytes, `None` if not measured
+        :param list errors: The `(path, exception)` tuples of all failures
+        :param float duration: The number of seconds spent cleaning
+        """
+        self.identifier = identifier
+        self.paths = paths
+        self.files = files
+        self.size = size
+        self.errors = errors
+        self.duration = duration
+
+
+def get_job_identifiers(group):
+    """
+    Get the identifiers of the jobs a path contributes to.
+
+    A path of a package contributes to the job of its base as well as to the
+    job of the package, e.g. `build` and `build/pkg_name`.
+
+    :param group: The `(base_name, pkg_name)` tuple or `None`
+    :rtype: tuple
+    """
+    if group is None:
+        return (DEFAULT_JOB_IDENTIFIER, )
+    base_name, pkg_name = group
+    if pkg_name is None:
+        return (base_name, )
+    return (base_name, f'{base_name}/{pkg_name}')
+
+
+class EventPublisher:
+    """
+    Publish the events of clean jobs to an event queue.
+
+    Event handlers expect each event to be accompanied by its job, therefore
+    a job without a task is created for each identifier.
+    """
+
+    def __init__(self, event_queue, args=None):  # noqa: D107
+        self._event_queue = event_queue
+        self._args = args
+        self._jobs = {}
+
+    def put(self, event):
+        """
+        Put an event into the queue together with the job it belongs to.
+
+        :param event: The event with a job identifier
+        """
+        job = self._jobs.get(event.identifier)
+        if job is None:
+            job = Job(
+                identifier=event.identifier, dependencies=set(), task=None,
+                task_context=TaskContext(
+                    pkg=None, args=self._args, dependencies=OrderedDict()))
+            self._jobs[event.identifier] = job
+        self._event_queue.put((event, job))
+
+
+class EventSummary(CleanSummary):
+    """
+    A clean summary publishing the progress of each job as events.
+
+    A job is started when the first of its paths is being cleaned and ended
+    when the last of its paths has been cleaned. If the paths are not known
+    upfront the jobs are only ended by :meth:`finish`.
+    """
+
+    def __init__(  # noqa: D107
+        self, event_publisher, paths=None, *, groups=None, usage_report=None
+    ):
+        super().__init__()
+        self._event_publisher = event_publisher
+        self._groups = groups or {}
+        self._remaining = {}
+        for path in paths or ():
+            for identifier in self._get_identifiers(path):
+                self._remaining[identifier] = \
+                    self._remaining.get(identifier, 0) + 1
+        self._usages = {}
+        if usage_report is not None:
+            self._usages[DEFAULT_JOB_IDENTIFIER] = usage_report.total
+            for base_name, usage in usage_report.bases.items():
+                self._usages[base_name] = usage
+            for base_name, packages in usage_report.packages.items():
+                for pkg_name, usage in packages.items():
+                    self._usages[f'{base_name}/{pkg_name}'] = usage
+        self._jobs = {}
+
+    def _get_identifiers(self, path):
+        return get_job_identifiers(self._groups.get(path))
+
+    def start(self, path):  # noqa: D102
+        for identifier in self._get_identifiers(path):
+            if identifier in self._jobs:
+                continue
+            self._jobs[identifier] = _Job(time.monotonic())
+            self._event_publisher.put(JobStarted(identifier))
+
+    def add(self, path, errors):  # noqa: D102
+        super().add(path, errors)
+        now = time.monotonic()
+        for identifier in reversed(self._get_identifiers(path)):
+            job = self._jobs.get(identifier)
+            if job is None:
+                self.start(path)
+                job = self._jobs[identifier]
+            job.paths += 1
+            job.errors.extend(errors)
+            total = self._remaining.get(identifier)
+            if total is not None and job.paths >= total:
+                self._end(identifier, now)
+            elif now - job.last_progress >= PROGRESS_INTERVAL:
+                job.last_progress = now
+                progress = f'{job.paths} paths' if total is None \
+                    else f'{job.paths}/{total} paths'
+                self._event_publisher.put(JobProgress(identifier, progress))
+
+    def finish(self):  # noqa: D102
+        now = time.monotonic()
+        for identifier in sorted(self._jobs.keys(), reverse=True):
+            self._end(identifier, now)
+
+    def _end(self, identifier, now):
+        job = self._jobs[identifier]
+        if job.ended:
+            return
+        job.ended = True
+        usage = self._usages.get(identifier)
+        self._event_publisher.put(CleanEnded(
+            identifier, job.paths,
+            usage.files if usage is not None else None,
+            usage.bytes if usage is not None else None,
+            job.errors, now - job.start_time))
+        self._event_publisher.put(JobEnded(identifier, 1 if job.errors else 0))
+
+
+class _Job:
+
+    __slots__ = ('start_time', 'last_progress', 'paths', 'errors', 'ended')
+
+    def __init__(self, start_time):
+        self.start_time = start_time
+        self.last_progress = start_time
+        self.paths = 0
+        self.errors = []
+        self.ended = False
@@ -0,0 +1,113 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import json
+import os
+import time
+
+from colcon_core.logging import colcon_logger
+
+logger = colcon_logger.getChild(__name__)
+
+INDEX_DIRNAME = '.colcon_clean_index'
+INDEX_FILENAME = 'index.json'
+INDEX_VERSION = 1
+
+# directories modified this close to the scan might change again within
+# the resolution of the file system timestamps
+RACY_MTIME_NS = 2 * 10 ** 9
+
+
+class ScanIndex:
+    """
+    The persisted result of the last scan of a directory.
+
+    For each scanned directory the index stores its modification time, the
+    names of the subdirectories which were descended into and the names of
+    the matching entries. Since the modification time of a directory only
+    changes when entries are added, removed or renamed, the cached names
+    of a directory with an unchanged modification time are still valid.
+    Subdirectories still need to be checked individually though.
+
+    The index is saved within a hidden subdirectory of the indexed
+    directory, which is only created once. Replacing the index within it
+    doesn't modify the indexed directory itself, so its cached scan stays
+    valid as well.
+    """
+
+    def __init__(self, directory, key):  # noqa: D107
+        self.path = os.path.join(
+            str(directory), INDEX_DIRNAME, INDEX_FILENAME)
+        self.key = key
+        self._previous = {}
+        self._previous_scan_ns = 0
+        self._current = {}
+        self._scan_ns = int(time.time() * 10 ** 9)
+
+    def load(self):
+        """Load the index of the previous scan if it matches the key."""
+        try:
+            with open(self.path, 'r') as h:
+                data = json.load(h)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.debug(f"Ignoring scan index '{self.path}': {e}")
+            return
+        if (
+            not isinstance(data, dict) or
+            data.get('version') != INDEX_VERSION or
+            data.get('key') != self.key
+        ):
+            return
+        self._previous = data.get('dirs', {})
+        self._previous_scan_ns = data.get('scan_ns', 0)
+
+    def lookup(self, relpath, mtime_ns):
+        """
+        Get the cached scan of a directory.
+
+        :param relpath: The slash separated path of the directory relative
+          to the indexed directory, an empty string for the directory itself
+        :param mtime_ns: The current modification time of the directory
+        :returns: The names of the subdirectories and of the matching entries
+          or `None` if the directory needs to be scanned
+        :rtype: tuple
+        """
+        cached = self._previous.get(relpath)
+        if (
+            cached is None or cached[0] != mtime_ns or
+            mtime_ns >= self._previous_scan_ns - RACY_MTIME_NS
+        ):
+            return None
+        self._current[relpath] = cached
+        return cached[1], cached[2]
+
+    def record(self, relpath, mtime_ns, subdirs, matches):
+        """
+        Record the scan of a directory.
+
+        :param relpath: The slash separated path of the directory relative
+          to the indexed directory, an empty string for the directory itself
+        :param mtime_ns: The modification time of the directory
+        :param subdirs: The names of the subdirectories descended into
+        :param matches: The names of the matching entries
+        """
+        self._current[relpath] = [mtime_ns, subdirs, matches]
+
+    def save(self):
+        """Atomically replace the index with the current scan."""
+        data = {
+            'version': INDEX_VERSION,
+            'key': self.key,
+            'scan_ns': self._scan_ns,
+            'dirs': self._current,
+        }
+        tmp_path = self.path + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, 'w') as h:
+                json.dump(data, h, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.debug(f"Failed to save scan index '{self.path}': {e}")
@@ -0,0 +1,183 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import json
+import os
+from pathlib import Path
+
+from colcon_clean.clean.plan import PathPlan
+from colcon_core.logging import colcon_logger
+
+logger = colcon_logger.getChild(__name__)
+
+JOURNAL_FILENAME = '.colcon_clean_journal.jsonl'
+
+JOURNAL_VERSION = 1
+
+# the kinds of the records following the header
+_PLANNED = '+'
+_COMPLETED = '-'
+
+
+class CleanJournal:
+    """
+    An append-only journal of the planned and completed paths of a clean.
+
+    The journal starts with a header followed by one record per planned
+    path, which are flushed to disk before the first path is deleted. A
+    record is appended for every path once it has been cleaned, so an
+    interrupted clean can be continued from the remaining paths without
+    scanning again. Each record is a JSON encoded list on a separate line,
+    so a record which was cut off by an interruption is simply ignored.
+
+    The records of completed paths are buffered, so after a hard kill a few
+    paths may be cleaned again, which is a no-op for missing paths.
+    """
+
+    def __init__(self, path):  # noqa: D107
+        self.path = Path(path)
+        self._file = None
+        # the size of the complete records found by load
+        self._size = None
+
+    def exists(self):
+        """
+        Check if the journal of an unfinished clean exists.
+
+        :rtype: bool
+        """
+        return self.path.is_file()
+
+    def load(self):
+        """
+        Load the paths which have been planned but not completed.
+
+        A trailing record which was cut off by an interruption is ignored
+        and removed once the journal is continued with :meth:`start`. A
+        journal cut off before its header was written is empty, since no
+        path is deleted before all planned paths have been written.
+
+        :returns: The plan of the remaining paths
+        :rtype: PathPlan
+        :raises ValueError: if the file isn't a journal of a supported
+          version
+        """
+        plan = PathPlan()
+        with self.path.open('rb') as h:
+            line = h.readline()
+            self._size = 0
+            if not line.endswith(b'\n'):
+                return plan
+            header = _parse_record(line)
+            if header != ['colcon-clean-journal', JOURNAL_VERSION]:
+                raise ValueError(
+                    f"Unsupported clean journal '{self.path}'")
+            self._size = len(line)
+            for line in h:
+                if not line.endswith(b'\n'):
+                    break
+                self._size += len(line)
+                record = _parse_record(line)
+                if not isinstance(record, list) or not record:
+                    continue
+                if record[0] == _PLANNED and len(record) == 3:
+                    group = tuple(record[2]) if record[2] else None
+                    plan.add(Path(record[1]), group)
+                elif record[0] == _COMPLETED and len(record) == 2:
+                    plan.remove(Path(record[1]))
+        return plan
+
+    def start(self, paths=None, *, groups=None):
+        """
+        Start recording the completed paths.
+
+        :param paths: The planned paths to start a new journal with, `None`
+          to append to the existing journal of a resumed clean
+        :param groups: The mapping of paths to `(base_name, pkg_name)` tuples
+        :returns: False if the journal can not be written
+        :rtype: bool
+        """
+        if groups is None:
+            groups = {}
+        try:
+            if paths is None:
+                if self._size is not None:
+                    os.truncate(str(self.path), self._size)
+                self._file = self.path.open('a')
+                return True
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open('w')
+            self._write(['colcon-clean-journal', JOURNAL_VERSION])
+            for path in paths:
+                group = groups.get(path)
+                self._write([_PLANNED, str(path), group])
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            logger.warning(
+                f"Failed to write clean journal '{self.path}': {e}")
+            self._close_file()
+            return False
+        return True
+
+    def complete(self, path):
+        """
+        Record that a path has been cleaned.
+
+        :param path: The path
+        """
+        if self._file is None:
+            return
+        try:
+            self._write([_COMPLETED, str(path)])
+        except OSError as e:
+            logger.warning(
+                f"Failed to write clean journal '{self.path}': {e}")
+            self._close_file()
+
+    def add(self, path, errors):
+        """
+        Record the outcome of cleaning a path.
+
+        Only paths which have been cleaned without errors are recorded, so
+        the others are retried when the clean is resumed.
+
+        :param path: The path which was cleaned
+        :param errors: The list of `(path, exception)` tuples collected while
+          cleaning the path
+        """
+        if not errors:
+            self.complete(path)
+
+    def close(self, *, finished):
+        """
+        Stop recording the completed paths.
+
+        :param finished: Flag if all planned paths have been cleaned, in
+          which case the journal is removed
+        """
+        self._close_file()
+        if finished:
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _write(self, record):
+        self._file.write(json.dumps(record) + '\n')
+
+    def _close_file(self):
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+        except OSError as e:
+            logger.debug(f"Failed to close clean journal '{self.path}': {e}")
+        self._file = None
+
+
+def _parse_record(line):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
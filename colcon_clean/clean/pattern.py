@@ -0,0 +1,167 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import re
+
+from pathspec import PathSpec
+
+_WILDCARD_CHARS = frozenset('*?[\\')
+
+
+class PatternMatcher:
+    """
+    A combined matcher for a list of gitignore style patterns.
+
+    A path matches if the last pattern matching it is not negated. The
+    patterns are therefore grouped into runs of consecutive patterns with
+    the same polarity, which are checked starting from the last run.
+    Within a run, literal names and suffixes like `*.gcda` are matched with
+    plain string operations and all remaining patterns are merged into a
+    single regular expression.
+    """
+
+    def __init__(self, patterns):  # noqa: D107
+        # empty lines are skipped when compiling the patterns
+        lines = [pattern for pattern in patterns if pattern]
+        path_spec = PathSpec.from_lines('gitwildmatch', lines)
+        self.patterns = []
+        for line, pattern in zip(lines, path_spec.patterns):
+            if pattern.include is None:
+                continue
+            self.patterns.append(
+                (pattern.include, pattern.regex, _get_literal_prefix(line),
+                 line))
+
+        self._runs = []
+        for include, regex, _, line in self.patterns:
+            if not self._runs or self._runs[-1].include != include:
+                self._runs.append(_PatternRun(include))
+            self._runs[-1].add(line, regex)
+        for run in self._runs:
+            run.finalize()
+        self._runs.reverse()
+
+    def match_file(self, relpath):
+        """
+        Check if a relative path matches the patterns.
+
+        :param relpath: The slash separated path relative to the scanned
+          directory
+        :rtype: bool
+        """
+        for run in self._runs:
+            if run.match(relpath):
+                return run.include
+        return False
+
+    def match_dir(self, relpath):
+        """
+        Check if every path below a directory matches the patterns.
+
+        A directory is covered when an including pattern matches the
+        directory itself, since that pattern matches everything below it as
+        well, and none of the following excluding patterns can match any
+        path below the directory.
+
+        :param relpath: The slash separated path of the directory relative
+          to the scanned directory
+        :rtype: bool
+        """
+        dirpath = relpath + '/'
+        covered = False
+        for include, regex, prefix, _ in self.patterns:
+            if include:
+                if not covered and regex.match(dirpath):
+                    covered = True
+            elif covered and (
+                prefix is None or
+                dirpath.startswith(prefix) or prefix.startswith(dirpath)
+            ):
+                covered = False
+        return covered
+
+
+class _PatternRun:
+    """Consecutive patterns with the same polarity."""
+
+    def __init__(self, include):
+        self.include = include
+        self.names = set()
+        self.dir_names = set()
+        self.suffixes = set()
+        self.regexes = []
+        self._dir_suffixes = ()
+        self._match_regex = None
+
+    def add(self, line, regex):
+        pattern = line[1:] if line.startswith('!') else line
+        dir_only = pattern.endswith('/')
+        name = pattern[:-1] if dir_only else pattern
+        if (
+            not name or '/' in name or name != name.strip() or
+            name.startswith('#')
+        ):
+            self.regexes.append(regex)
+        elif not _WILDCARD_CHARS.intersection(name):
+            (self.dir_names if dir_only else self.names).add(name)
+        elif (
+            not dir_only and name.startswith('*') and
+            not _WILDCARD_CHARS.intersection(name[1:])
+        ):
+            self.suffixes.add(name[1:])
+        else:
+            self.regexes.append(regex)
+
+    def finalize(self):
+        # names are matched as whole components of the slash wrapped path
+        self.names = tuple(f'/{name}/' for name in sorted(self.names))
+        self.dir_names = tuple(
+            f'/{name}/' for name in sorted(self.dir_names))
+        self.suffixes = tuple(sorted(self.suffixes))
+        # a directory matching a suffix matches everything below it
+        self._dir_suffixes = tuple(suffix + '/' for suffix in self.suffixes)
+        if self.regexes:
+            # the named groups of the individual patterns are only used to
+            # detect directory matches and would collide when merged
+            self._match_regex = re.compile('|'.join(
+                '(?:{})'.format(re.sub(r'\(\?P<\w+>', '(?:', regex.pattern))
+                for regex in self.regexes))
+
+    def match(self, relpath):
+        if self.suffixes:
+            if relpath.endswith(self.suffixes):
+                return True
+            for dir_suffix in self._dir_suffixes:
+                if dir_suffix in relpath:
+                    return True
+        if self.names:
+            wrapped = f'/{relpath}/'
+            for name in self.names:
+                if name in wrapped:
+                    return True
+        if self.dir_names:
+            # the last component of a file is never a directory
+            wrapped = f'/{relpath}'
+            for name in self.dir_names:
+                if name in wrapped:
+                    return True
+        if self._match_regex is not None:
+            return self._match_regex.match(relpath) is not None
+        return False
+
+
+def _get_literal_prefix(pattern):
+    """
+    Get the literal prefix of all paths a pattern can match.
+
+    :param pattern: The gitignore style pattern, optionally negated
+    :returns: The prefix or `None` if the pattern can match at any depth
+    :rtype: str
+    """
+    pattern = pattern[1:] if pattern.startswith('!') else pattern
+    if pattern.startswith('/'):
+        pattern = pattern[1:]
+    elif '/' not in pattern.rstrip('/'):
+        # patterns without a slash match relative to any directory
+        return None
+    return re.match(r'[^*?[\\]*', pattern).group()
@@ -0,0 +1,117 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import queue
+import threading
+
+from colcon_clean.clean.delete import get_default_workers
+from colcon_clean.clean.trie import get_nested_paths
+from colcon_clean.clean.trie import PathTrie
+
+_DONE = object()
+
+
+class ScanPipeline:
+    """
+    Scan directories concurrently and stream the found paths.
+
+    The paths are passed from the scanning workers to the consumer through a
+    bounded queue, so scanning pauses while the consumer falls behind.
+    Duplicate directories, e.g. from bases sharing the same base path, are
+    only scanned once. Only the paths found in directories nested within
+    each other are remembered to skip paths below an already produced path,
+    so the memory usage is independent of the number of paths otherwise.
+
+    The scan callable is passed each directory and the `threading.Event`
+    which is set once the pipeline is cancelled, so it can also stop while
+    it doesn't find any paths.
+    """
+
+    def __init__(self, directories, scan, *, workers=None):  # noqa: D107
+        if workers is None:
+            workers = get_default_workers()
+        self._scan = scan
+        directories = list(dict.fromkeys(directories))
+        self._nested = get_nested_paths(directories)
+        self._queue = queue.Queue(maxsize=workers * 64)
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._remaining = len(directories)
+        self._buffer = deque()
+        self._produced = PathTrie()
+        self._done = False
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._futures = [
+            self._executor.submit(self._scan_directory, directory)
+            for directory in directories]
+        if not directories:
+            self._queue.put(_DONE)
+
+    def _scan_directory(self, directory):
+        unique = Path(directory) not in self._nested
+        try:
+            if self._cancelled.is_set():
+                return
+            for path in self._scan(directory, self._cancelled):
+                if not self._put((path, unique)):
+                    return
+        finally:
+            with self._lock:
+                self._remaining -= 1
+                last = not self._remaining
+            if last:
+                self._put(_DONE)
+
+    def _put(self, item):
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+    def _fill(self):
+        item = self._queue.get()
+        if item is _DONE:
+            self._done = True
+            return
+        path, unique = item
+        if unique or self._produced.add(path):
+            self._buffer.append(path)
+
+    def peek(self, count):
+        """
+        Wait for the first paths without consuming them.
+
+        :param count: The number of paths to wait for
+        :returns: The list of up to `count` paths and the flag if all
+          directories have been scanned
+        :rtype: tuple
+        """
+        while len(self._buffer) < count and not self._done:
+            self._fill()
+        return list(self._buffer)[:count], self._done and \
+            len(self._buffer) <= count
+
+    def __iter__(self):  # noqa: D105
+        while True:
+            if self._buffer:
+                yield self._buffer.popleft()
+            elif self._done:
+                return
+            else:
+                self._fill()
+
+    def cancel(self):
+        """Stop scanning the directories which haven't been finished yet."""
+        self._cancelled.set()
+
+    def close(self):
+        """Wait for the scanning workers and raise their exceptions."""
+        self._executor.shutdown(wait=True)
+        for future in self._futures:
+            future.result()
@@ -0,0 +1,276 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import gzip
+import json
+import os
+from pathlib import Path
+import zlib
+
+PLAN_FORMAT = 'colcon-clean-plan'
+
+PLAN_VERSION = 1
+
+
+class PathPlan:
+    """
+    A compact collection of the paths to clean and their groups.
+
+    Instead of one `Path` object per path, each parent directory is stored
+    once and maps the names of the planned paths within it to the index of
+    their group, so a plan of millions of paths only needs a fraction of the
+    memory of a set of paths. The paths are iterated sorted by their parent
+    directory and name, and `Path` objects are only created while iterating.
+
+    The plan can also be used as the mapping of paths to their
+    `(base_name, pkg_name)` groups, e.g. for :func:`get_usage_report`.
+    """
+
+    def __init__(self):  # noqa: D107
+        self._directories = {}
+        self._groups = []
+        self._group_indices = {}
+        self._count = 0
+
+    def add(self, path, group=None):
+        """
+        Add a path unless it is already planned.
+
+        :param path: The path to add
+        :param group: The `(base_name, pkg_name)` tuple of the path or `None`
+        :returns: True if the path was added
+        :rtype: bool
+        """
+        directory, name = os.path.split(str(path))
+        names = self._directories.get(directory)
+        if names is None:
+            names = self._directories[directory] = {}
+        elif name in names:
+            return False
+        index = self._group_indices.get(group)
+        if index is None:
+            index = self._group_indices[group] = len(self._groups)
+            self._groups.append(group)
+        names[name] = index
+        self._count += 1
+        return True
+
+    def remove(self, path):
+        """
+        Remove a path if it is planned.
+
+        :param path: The path to remove
+        :returns: True if the path was removed
+        :rtype: bool
+        """
+        directory, name = os.path.split(str(path))
+        names = self._directories.get(directory)
+        if names is None or name not in names:
+            return False
+        del names[name]
+        if not names:
+            del self._directories[directory]
+        self._count -= 1
+        return True
+
+    def get(self, path, default=None):
+        """
+        Get the group of a planned path.
+
+        :param path: The path
+        :param default: The value to return if the path isn't planned or has
+          no group
+        :returns: The `(base_name, pkg_name)` tuple of the path
+        """
+        directory, name = os.path.split(str(path))
+        index = self._directories.get(directory, {}).get(name)
+        if index is None:
+            return default
+        group = self._groups[index]
+        return default if group is None else group
+
+    def remove_nested(self):
+        """
+        Remove the paths below other planned paths.
+
+        Since all paths within a directory share the same ancestors, only the
+        ancestors of each directory are looked up.
+
+        :returns: The number of removed paths
+        :rtype: int
+        """
+        removed = 0
+        for directory in list(self._directories.keys()):
+            if self._is_below_planned_path(directory):
+                removed += len(self._directories.pop(directory))
+        self._count -= removed
+        return removed
+
+    def _is_below_planned_path(self, directory):
+        while True:
+            parent, name = os.path.split(directory)
+            if not name:
+                return False
+            if name in self._directories.get(parent, ()):
+                return True
+            directory = parent
+
+    def keys(self):
+        """
+        Iterate the planned paths.
+
+        :returns: A generator of paths
+        """
+        return iter(self)
+
+    def items(self):
+        """
+        Iterate the planned paths together with their groups.
+
+        :returns: A generator of `(path, group)` tuples
+        """
+        for directory in sorted(self._directories.keys()):
+            names = self._directories[directory]
+            directory_path = Path(directory)
+            for name in sorted(names.keys()):
+                yield directory_path / name, self._groups[names[name]]
+
+    def save(self, path):
+        """
+        Save the plan to a file to clean its paths later.
+
+        The file is a gzip compressed JSON document per line, starting with
+        a header listing the groups, followed by one line per directory with
+        the names of its planned paths. Along with each name the inode
+        number and the modification time of the path are stored, so the
+        paths can be checked cheaply when the plan is loaded. Paths which
+        don't exist anymore are not saved.
+
+        :param path: The path of the plan file
+        :returns: The number of saved paths
+        :rtype: int
+        """
+        count = 0
+        with gzip.open(str(path), 'wt') as h:
+            h.write(json.dumps({
+                'format': PLAN_FORMAT,
+                'version': PLAN_VERSION,
+                'groups': self._groups,
+            }) + '\n')
+            for directory in sorted(self._directories.keys()):
+                entries = []
+                names = self._directories[directory]
+                for name in sorted(names.keys()):
+                    try:
+                        st = os.lstat(os.path.join(directory, name))
+                    except OSError:
+                        continue
+                    entries.append(
+                        [name, names[name], st.st_ino, st.st_mtime_ns])
+                if entries:
+                    h.write(json.dumps([directory, entries]) + '\n')
+                    count += len(entries)
+        return count
+
+    @classmethod
+    def load(cls, path, *, validate=True):
+        """
+        Load a plan saved with :meth:`save`.
+
+        :param path: The path of the plan file
+        :param validate: Flag if paths which have disappeared or have been
+          replaced or modified since the plan was saved should be skipped,
+          which takes a single `lstat` per path
+        :returns: The plan and the number of skipped paths
+        :rtype: tuple
+        :raises OSError: if the plan file can't be read
+        :raises ValueError: if the plan file is truncated or not a plan
+        """
+        plan = cls()
+        skipped = 0
+        try:
+            with gzip.open(str(path), 'rt') as h:
+                header = json.loads(h.readline())
+                if not isinstance(header, dict) or \
+                        header.get('format') != PLAN_FORMAT or \
+                        header.get('version') != PLAN_VERSION:
+                    raise ValueError(f"Unsupported clean plan '{path}'")
+                groups = header.get('groups')
+                if not isinstance(groups, list) or \
+                        not all(map(_is_group, groups)):
+                    raise ValueError(f"Invalid clean plan '{path}'")
+                groups = [
+                    tuple(group) if group is not None else None
+                    for group in groups]
+                for line in h:
+                    record = json.loads(line)
+                    if not _is_record(record, len(groups)):
+                        raise ValueError(f"Invalid clean plan '{path}'")
+                    directory, entries = record
+                    for name, index, ino, mtime_ns in entries:
+                        if validate:
+                            try:
+                                st = os.lstat(os.path.join(directory, name))
+                            except OSError:
+                                skipped += 1
+                                continue
+                            if st.st_ino != ino or \
+                                    st.st_mtime_ns != mtime_ns:
+                                skipped += 1
+                                continue
+                        plan.add(os.path.join(directory, name), groups[index])
+        except (EOFError, zlib.error) as e:
+            raise ValueError(f"Truncated clean plan '{path}': {e}")
+        return plan, skipped
+
+    def __contains__(self, path):  # noqa: D105
+        directory, name = os.path.split(str(path))
+        return name in self._directories.get(directory, ())
+
+    def __len__(self):  # noqa: D105
+        return self._count
+
+    def __iter__(self):  # noqa: D105
+        for path, _ in self.items():
+            yield path
+
+
+def _is_group(group):
+    # a group is either None or a (base_name, pkg_name) pair
+    return group is None or (
+        isinstance(group, list) and len(group) == 2 and
+        all(name is None or isinstance(name, str) for name in group))
+
+
+def _is_record(record, group_count):
+    # a record is a [directory, [[name, index, ino, mtime_ns], ...]] pair
+    if not isinstance(record, list) or len(record) != 2:
+        return False
+    directory, entries = record
+    if not isinstance(directory, str) or not isinstance(entries, list):
+        return False
+    for entry in entries:
+        if not isinstance(entry, list) or len(entry) != 4:
+            return False
+        name, index, ino, mtime_ns = entry
+        if not isinstance(name, str) or \
+                not all(isinstance(n, int) for n in (index, ino, mtime_ns)):
+            return False
+        if not 0 <= index < group_count:
+            return False
+    return True
+
+
+def sorted_paths(paths):
+    """
+    Get paths in a deterministic order.
+
+    A :class:`PathPlan` is already iterated in sorted order, so it is passed
+    through instead of creating all paths at once.
+
+    :param paths: The paths
+    :returns: The iterable of sorted paths
+    """
+    if isinstance(paths, PathPlan):
+        return paths
+    return sorted(paths)
@@ -0,0 +1,148 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+from contextlib import contextmanager
+import cProfile
+import json
+import os
+import threading
+import time
+
+from colcon_core.location import get_log_path
+from colcon_core.logging import colcon_logger
+
+logger = colcon_logger.getChild(__name__)
+
+PROFILE_FORMATS = ('summary', 'cprofile', 'trace')
+PROFILE_FILENAME = 'clean.prof'
+TRACE_FILENAME = 'clean_trace.json'
+
+
+class Phase:
+    """The wall time, CPU time and path count of a phase of cleaning."""
+
+    __slots__ = ('name', 'start', 'wall', 'cpu', 'paths')
+
+    def __init__(self, name, start):  # noqa: D107
+        self.name = name
+        self.start = start
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.paths = None
+
+
+class PhaseProfiler:
+    """
+    Record the time spent in each phase of cleaning.
+
+    The CPU time is the time of the whole process, including the time of
+    the worker threads. When used as a context manager with the `cprofile`
+    format, the calling thread is also profiled by :mod:`cProfile`.
+    """
+
+    def __init__(self, profile_format=None, log_path=None):  # noqa: D107
+        self.profile_format = profile_format
+        self.log_path = log_path
+        self.phases = []
+        self._start = time.perf_counter()
+        self._profile = None
+
+    @property
+    def enabled(self):
+        """Flag if the phases are being recorded."""
+        return self.profile_format is not None
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Record the duration of a phase.
+
+        The context yields the :class:`Phase` whose `paths` attribute can be
+        set to the number of paths processed in the phase.
+
+        :param name: The name of the phase
+        """
+        phase = Phase(name, time.perf_counter() - self._start)
+        cpu_start = time.process_time()
+        try:
+            yield phase
+        finally:
+            phase.wall = time.perf_counter() - self._start - phase.start
+            phase.cpu = time.process_time() - cpu_start
+            if self.enabled:
+                self.phases.append(phase)
+
+    def __enter__(self):  # noqa: D105
+        if self.profile_format == 'cprofile':
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):  # noqa: D105
+        if self._profile is not None:
+            self._profile.disable()
+        if self.enabled:
+            self.report()
+
+    def report(self):
+        """
+        Print the recorded phases and write the requested profile.
+
+        The profile is written to the log path passed to the constructor or
+        to the log directory of the current invocation.
+        """
+        lines = [f'{"phase":<12} {"wall":>9} {"cpu":>9} {"paths":>8}']
+        for phase in self.phases:
+            paths = '' if phase.paths is None else phase.paths
+            lines.append(
+                f'{phase.name:<12} {phase.wall:>8.3f}s {phase.cpu:>8.3f}s '
+                f'{paths:>8}')
+        for line in lines:
+            logger.info(line)
+            print(line)
+
+        if self.profile_format == 'summary':
+            return
+        log_path = self.log_path
+        if log_path is None:
+            log_path = get_log_path()
+        if log_path is None:
+            logger.warning(
+                f"Skipping the '{self.profile_format}' profile since logging "
+                'is disabled')
+            return
+        os.makedirs(str(log_path), exist_ok=True)
+        if self.profile_format == 'cprofile':
+            path = os.path.join(str(log_path), PROFILE_FILENAME)
+            self._profile.dump_stats(path)
+        else:
+            path = os.path.join(str(log_path), TRACE_FILENAME)
+            with open(path, 'w') as h:
+                json.dump(self.get_trace(), h)
+        logger.info(f"Wrote profile: '{path}'")
+        print(f"Wrote profile: '{path}'")
+
+    def get_trace(self):
+        """
+        Get the recorded phases in the Chrome trace event format.
+
+        :rtype: dict
+        """
+        pid = os.getpid()
+        tid = threading.get_ident()
+        events = []
+        for phase in self.phases:
+            args = {'cpu': phase.cpu}
+            if phase.paths is not None:
+                args['paths'] = phase.paths
+            events.append({
+                'name': phase.name,
+                'cat': 'clean',
+                'ph': 'X',
+                'ts': round(phase.start * 1e6),
+                'dur': round(phase.wall * 1e6),
+                'pid': pid,
+                'tid': tid,
+                'args': args,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
@@ -0,0 +1,300 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import stat
+
+from colcon_clean.clean.delete import get_default_workers
+from colcon_clean.clean.plan import sorted_paths
+from colcon_clean.clean.trie import AncestorMap
+
+REPORT_FORMATS = ('text', 'json')
+
+
+class PathUsage:
+    """The disk usage of a collection of paths."""
+
+    def __init__(self):  # noqa: D107
+        self.paths = 0
+        self.files = 0
+        self.bytes = 0
+
+    def add(self, usage):
+        """
+        Add the disk usage of other paths.
+
+        :param usage: The disk usage to add
+        """
+        self.paths += usage.paths
+        self.files += usage.files
+        self.bytes += usage.bytes
+
+    def to_dict(self):
+        """
+        Get the disk usage as a dictionary.
+
+        :rtype: dict
+        """
+        return {'paths': self.paths, 'files': self.files, 'bytes': self.bytes}
+
+
+class UsageReport:
+    """The disk usage of paths broken down by base and package."""
+
+    def __init__(self):  # noqa: D107
+        self.total = PathUsage()
+        self.bases = {}
+        self.packages = {}
+
+    def add(self, usage, *, base_name=None, pkg_name=None):
+        """
+        Record the disk usage of a single path.
+
+        :param usage: The disk usage of the path
+        :param base_name: The name of the base handler selecting the path
+        :param pkg_name: The name of the package the path belongs to
+        """
+        self.total.add(usage)
+        if base_name is None:
+            return
+        self.bases.setdefault(base_name, PathUsage()).add(usage)
+        if pkg_name is None:
+            return
+        self.packages.setdefault(base_name, {}) \
+            .setdefault(pkg_name, PathUsage()).add(usage)
+
+    def to_dict(self):
+        """
+        Get the report as a dictionary.
+
+        :rtype: dict
+        """
+        bases = {}
+        for base_name in sorted(self.bases.keys()):
+            base = self.bases[base_name].to_dict()
+            packages = self.packages.get(base_name, {})
+            base['packages'] = {
+                pkg_name: packages[pkg_name].to_dict()
+                for pkg_name in sorted(packages.keys())}
+            bases[base_name] = base
+        return {'total': self.total.to_dict(), 'bases': bases}
+
+
+def get_usage_report(paths, *, groups=None, workers=None):
+    """
+    Measure the disk usage of paths using a bounded pool of workers.
+
+    The directory trees of the paths are split at their first level, so
+    the subdirectories of a single path, e.g. the packages of a base, are
+    measured concurrently as well.
+
+    :param paths: The paths to measure
+    :param groups: The mapping of paths to `(base_name, pkg_name)` tuples,
+      paths without a group are only included in the total
+    :param workers: The number of concurrent workers, `None` to use the
+      number of CPUs
+    :rtype: UsageReport
+    """
+    if workers is None:
+        workers = get_default_workers()
+    if groups is None:
+        groups = {}
+    report = UsageReport()
+
+    def add(path, future):
+        usage, subdirectory_futures = future.result()
+        for subdirectory_future in subdirectory_futures:
+            subdirectory_usage = subdirectory_future.result()
+            usage.files += subdirectory_usage.files
+            usage.bytes += subdirectory_usage.bytes
+        base_name, pkg_name = groups.get(path, (None, None))
+        report.add(usage, base_name=base_name, pkg_name=pkg_name)
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for path in sorted_paths(paths):
+            pending.append((path, executor.submit(
+                _get_split_path_usage, path, executor.submit)))
+            if len(pending) >= workers * 4:
+                add(*pending.popleft())
+        while pending:
+            add(*pending.popleft())
+    return report
+
+
+def _get_split_path_usage(path, submit):
+    # measure the path and its files, but submit its subdirectories
+    usage = PathUsage()
+    usage.paths = 1
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return usage, []
+    usage.bytes += _get_allocated_bytes(st)
+    if not stat.S_ISDIR(st.st_mode):
+        usage.files += 1
+        return usage, []
+
+    futures = []
+    try:
+        entries = os.scandir(path)
+    except OSError:
+        return usage, futures
+    with entries:
+        for entry in entries:
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if stat.S_ISDIR(st.st_mode):
+                futures.append(submit(get_path_usage, entry.path))
+            else:
+                usage.bytes += _get_allocated_bytes(st)
+                usage.files += 1
+    return usage, futures
+
+
+def get_path_usage(path):
+    """
+    Measure the disk usage of a single file or directory tree.
+
+    The usage is based on the allocated blocks rather than the apparent size
+    where the platform provides them. Symbolic links are not followed and
+    paths which vanish or can not be read are skipped.
+
+    :param path: The path to measure
+    :rtype: PathUsage
+    """
+    usage = PathUsage()
+    usage.paths = 1
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return usage
+    usage.bytes += _get_allocated_bytes(st)
+    if not stat.S_ISDIR(st.st_mode):
+        usage.files += 1
+        return usage
+
+    stack = [str(path)]
+    while stack:
+        dirpath = stack.pop()
+        try:
+            entries = os.scandir(dirpath)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                usage.bytes += _get_allocated_bytes(st)
+                if stat.S_ISDIR(st.st_mode):
+                    stack.append(entry.path)
+                else:
+                    usage.files += 1
+    return usage
+
+
+def _get_allocated_bytes(st):
+    blocks = getattr(st, 'st_blocks', None)
+    if blocks is None:  # pragma: no cover
+        return st.st_size
+    # st_blocks is always in units of 512 bytes
+    return blocks * 512
+
+
+def summarize_paths(paths, *, groups=None, base_paths=None):
+    """
+    Summarize paths by base and package.
+
+    The paths are only iterated once and not sorted, so the time to
+    summarize stays proportional to the number of paths.
+
+    :param paths: The paths to summarize
+    :param groups: The mapping of paths to `(base_name, pkg_name)` tuples,
+      paths without a group are summarized together
+    :param base_paths: The base directories of the paths, paths of a group
+      without a package are summarized by the first path component below
+      their base directory, e.g. by package for workspace cleans
+    :returns: The list of `(directory, base_name, pkg_name, count)` tuples
+      sorted by directory, where the directory is the deepest common
+      directory of the paths of a group or the path itself for a single path
+    :rtype: list
+    """
+    if groups is None:
+        groups = {}
+    bases = AncestorMap({path: str(path) for path in base_paths or ()})
+    summary = {}
+    for path in paths:
+        group = groups.get(path, (None, None))
+        path = str(path)
+        key = (group, None)
+        if group[1] is None:
+            base_path = bases.get(path)
+            if base_path is not None and path != base_path:
+                relpath = path[len(base_path) + 1:]
+                key = (group, relpath.split(os.sep, 1)[0])
+        entry = summary.get(key)
+        if entry is None:
+            summary[key] = [path, 1]
+            continue
+        entry[1] += 1
+        if not path.startswith(entry[0] + os.sep):
+            entry[0] = os.path.commonpath([entry[0], path])
+    return sorted((
+        (directory, base_name, pkg_name, count)
+        for ((base_name, pkg_name), _), (directory, count) in summary.items()
+    ), key=lambda entry: entry[0])
+
+
+def format_size(size):
+    """
+    Format a number of bytes for humans.
+
+    :param size: The number of bytes
+    :rtype: str
+    """
+    for unit in ('B', 'KiB', 'MiB', 'GiB', 'TiB'):
+        if size < 1024 or unit == 'TiB':
+            break
+        size /= 1024
+    if unit == 'B':
+        return f'{size} {unit}'
+    return f'{size:.1f} {unit}'
+
+
+def format_report(report, *, report_format='text', dry_run=False):
+    """
+    Format a usage report.
+
+    :param report: The usage report
+    :param report_format: The format, either `text` or `json`
+    :param dry_run: The flag if no paths have been cleaned
+    :rtype: str
+    """
+    if report_format == 'json':
+        data = report.to_dict()
+        data['dry_run'] = dry_run
+        return json.dumps(data, indent=2, sort_keys=True)
+
+    rows = []
+    for base_name, base in report.to_dict()['bases'].items():
+        rows.append((base_name, '', base))
+        for pkg_name, package in base['packages'].items():
+            rows.append(('', pkg_name, package))
+    rows.append(('total', '', report.total.to_dict()))
+
+    verb = 'Would free' if dry_run else 'Freed'
+    width = max(len(row[0]) + 2 + len(row[1]) for row in rows)
+    lines = [f'{verb}:']
+    for base_name, pkg_name, usage in rows:
+        name = f'{base_name}  {pkg_name}' if pkg_name else base_name
+        lines.append(
+            f'    {name:<{width}}  {usage["files"]:>10} files  '
+            f'{format_size(usage["bytes"]):>10}')
+    return '\n'.join(lines)
@@ -0,0 +1,233 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import datetime
+import os
+from pathlib import Path
+import time
+
+from colcon_clean.clean.index import INDEX_DIRNAME
+from colcon_clean.clean.index import ScanIndex
+from colcon_clean.clean.pattern import PatternMatcher
+from colcon_clean.clean.trash import TRASH_DIRNAME
+from colcon_core.logging import colcon_logger
+
+logger = colcon_logger.getChild(__name__)
+
+# entries created by this extension which are never matched
+INTERNAL_NAMES = frozenset({INDEX_DIRNAME, TRASH_DIRNAME})
+
+
+class ScanFilter:
+    """
+    The filter deciding which entries of a scanned directory are included.
+
+    Only files and symbolic links are matched against the patterns, using
+    their path relative to the scanned directory. Directories are descended
+    into, except for symbolic links to directories and directories where
+    every path below is known to match.
+
+    Optionally files are additionally selected by their modification time
+    and size, which are compared against cutoffs computed once when the
+    filter is created.
+    """
+
+    def __init__(  # noqa: D107
+        self, *, linked_dirs=True, linked_files=True, match=None,
+        older_than=None, newer_than=None, larger_than=None, now=None,
+    ):
+        self.linked_dirs = linked_dirs
+        self.linked_files = linked_files
+        self.match_patterns = ['*'] if match is None else list(match)
+        if self.match_patterns == ['*']:
+            self._matcher = None
+        else:
+            self._matcher = PatternMatcher(self.match_patterns)
+        if now is None and (older_than is not None or newer_than is not None):
+            now = int(time.time() * 10 ** 9)
+        self._max_mtime_ns = None
+        if older_than is not None:
+            self._max_mtime_ns = now - _get_nanoseconds(older_than)
+        self._min_mtime_ns = None
+        if newer_than is not None:
+            self._min_mtime_ns = now - _get_nanoseconds(newer_than)
+        self._min_size = larger_than
+        self.uses_stat = (
+            older_than is not None or newer_than is not None or
+            larger_than is not None)
+
+    def match_file(self, relpath):
+        """
+        Check if a relative path matches the patterns.
+
+        :param relpath: The slash separated path relative to the scanned
+          directory
+        :rtype: bool
+        """
+        if self._matcher is None:
+            return True
+        return self._matcher.match_file(relpath)
+
+    def match_dir(self, relpath):
+        """
+        Check if every path below a directory matches the patterns.
+
+        Directories are never covered if symbolic links are excluded, since
+        the content of a covered directory is not inspected.
+
+        :param relpath: The slash separated path of the directory relative
+          to the scanned directory
+        :rtype: bool
+        """
+        if not self.linked_dirs or not self.linked_files or self.uses_stat:
+            return False
+        if self._matcher is None:
+            return True
+        return self._matcher.match_dir(relpath)
+
+    def include_link(self, entry):
+        """
+        Check if a symbolic link is included.
+
+        :param entry: The `os.DirEntry` of the symbolic link
+        :rtype: bool
+        """
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            # e.g. a cyclic link
+            is_dir = False
+        return self.linked_dirs if is_dir else self.linked_files
+
+    def match_stat(self, entry):
+        """
+        Check if the modification time and size of an entry match.
+
+        The `stat` result is cached by the `os.DirEntry`, and on Windows it
+        is already provided by the directory listing itself. Entries which
+        can't be inspected anymore, e.g. because they have been removed in
+        the meantime, don't match.
+
+        :param entry: The `os.DirEntry` of a file or symbolic link
+        :rtype: bool
+        """
+        if not self.uses_stat:
+            return True
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            return False
+        if self._max_mtime_ns is not None and \
+                st.st_mtime_ns >= self._max_mtime_ns:
+            return False
+        if self._min_mtime_ns is not None and \
+                st.st_mtime_ns <= self._min_mtime_ns:
+            return False
+        if self._min_size is not None and st.st_size <= self._min_size:
+            return False
+        return True
+
+    def get_key(self):
+        """
+        Get a key identifying the selection of the filter.
+
+        :rtype: list
+        """
+        return [self.match_patterns, self.linked_dirs, self.linked_files]
+
+
+def scan_tree(directory, scan_filter, *, use_index=False, cancelled=None):
+    """
+    Walk a directory and yield the included files.
+
+    The directory is walked with `os.scandir` and the type information of
+    each `os.DirEntry` is reused, so no additional `stat` calls are necessary
+    for the common case. Symbolic links are never followed but are matched
+    like files. Directories where every path below matches are yielded
+    instead of being descended into.
+
+    If the filter selects files by their modification time or size, the
+    `stat` of each entry is only fetched once it matches the patterns and
+    directories are always descended into.
+
+    Optionally the result is persisted in an index in the directory. Later
+    scans with the same filter only `stat` each directory and list only the
+    directories which have been modified since.
+
+    :param directory: The directory to walk
+    :param scan_filter: The scan filter
+    :param use_index: The flag if the persisted index should be used
+    :param cancelled: The `threading.Event` to stop walking before the next
+      directory once it is set, in which case the index isn't persisted
+    :returns: A generator of matching paths
+    """
+    index = None
+    if use_index and scan_filter.uses_stat:
+        # the index can't tell if files have aged or changed their size
+        logger.debug(
+            f"Not using the scan index of '{directory}' with age or size "
+            'filters')
+    elif use_index:
+        index = ScanIndex(directory, scan_filter.get_key())
+        index.load()
+
+    stack = [(str(directory), '')]
+    while stack:
+        if cancelled is not None and cancelled.is_set():
+            return
+        dirpath, relprefix = stack.pop()
+        if index is not None:
+            try:
+                mtime_ns = os.lstat(dirpath).st_mtime_ns
+            except OSError:
+                continue
+            cached = index.lookup(relprefix, mtime_ns)
+            if cached is not None:
+                subdirs, matches = cached
+                for name in matches:
+                    yield Path(dirpath, name)
+                for name in subdirs:
+                    stack.append((
+                        os.path.join(dirpath, name), relprefix + name + '/'))
+                continue
+            subdirs = []
+            matches = []
+
+        try:
+            entries = os.scandir(dirpath)
+        except OSError as e:
+            logger.warning(f"Skipping path: '{dirpath}'")
+            logger.info(f"Skipping info: '{e}'")
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name in INTERNAL_NAMES:
+                    continue
+                relpath = relprefix + entry.name
+                if entry.is_symlink():
+                    if not scan_filter.include_link(entry):
+                        continue
+                elif entry.is_dir(follow_symlinks=False):
+                    if scan_filter.match_dir(relpath):
+                        yield Path(entry.path)
+                        if index is not None:
+                            matches.append(entry.name)
+                    else:
+                        stack.append((entry.path, relpath + '/'))
+                        if index is not None:
+                            subdirs.append(entry.name)
+                    continue
+                if scan_filter.match_file(relpath) and \
+                        scan_filter.match_stat(entry):
+                    yield Path(entry.path)
+                    if index is not None:
+                        matches.append(entry.name)
+        if index is not None:
+            index.record(relprefix, mtime_ns, subdirs, matches)
+
+    if index is not None:
+        index.save()
+
+
+def _get_nanoseconds(delta):
+    return delta // datetime.timedelta(microseconds=1) * 1000
@@ -0,0 +1,152 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import os
+from pathlib import Path
+import subprocess
+import sys
+import uuid
+
+from colcon_clean.clean.delete import delete_path
+from colcon_clean.clean.plan import sorted_paths
+from colcon_core.logging import colcon_logger
+
+logger = colcon_logger.getChild(__name__)
+
+TRASH_DIRNAME = '.colcon_clean_trash'
+
+
+def move_paths_to_trash(paths, *, summary):
+    """
+    Atomically move paths into a hidden trash directory.
+
+    Each path is renamed into a trash directory next to it, which keeps the
+    trash on the same filesystem and makes the rename an atomic operation
+    independent of the size of the path.
+
+    :param paths: The paths to move
+    :param summary: The clean summary to record the moved paths in
+    :returns: The paths which could not be moved and the set of trash
+      directories which received paths
+    :rtype: tuple
+    """
+    remaining = []
+    trash_dirs = set()
+    for path in sorted_paths(paths):
+        summary.start(path)
+        trash_dir = path.parent / TRASH_DIRNAME
+        try:
+            trash_dir.mkdir(exist_ok=True)
+            os.rename(path, trash_dir / f'{path.name}-{uuid.uuid4().hex}')
+        except FileNotFoundError:
+            summary.add(path, [])
+            continue
+        except OSError as e:
+            # e.g. the path is a mount point or the parent is read-only
+            logger.debug(f"Failed to move path '{path}' to trash: {e}")
+            remaining.append(path)
+            continue
+        logger.info(f"Moved path to trash: '{path}'")
+        trash_dirs.add(trash_dir)
+        summary.add(path, [])
+    return remaining, trash_dirs
+
+
+def find_trash_dirs(directories):
+    """
+    Find leftover trash directories, e.g. from interrupted reapers.
+
+    :param directories: The directories which might contain a trash directory
+    :returns: The existing trash directories
+    :rtype: set
+    """
+    trash_dirs = set()
+    for directory in directories:
+        trash_dir = Path(directory) / TRASH_DIRNAME
+        if trash_dir.is_dir():
+            trash_dirs.add(trash_dir)
+    return trash_dirs
+
+
+def spawn_reaper(trash_dirs):
+    """
+    Start a detached low priority process deleting the trash directories.
+
+    The trash directories are passed to the process through its standard
+    input, since a filtered clean may create too many of them for the
+    command line.
+
+    :param trash_dirs: The trash directories to delete
+    :returns: The process id of the reaper
+    :rtype: int
+    """
+    cmd = [sys.executable, '-m', __name__]
+    kwargs = {}
+    if sys.platform == 'win32':  # pragma: no cover
+        kwargs['creationflags'] = \
+            subprocess.DETACHED_PROCESS | \
+            subprocess.CREATE_NEW_PROCESS_GROUP | \
+            subprocess.IDLE_PRIORITY_CLASS
+    else:
+        kwargs['start_new_session'] = True
+    process = subprocess.Popen(
+        cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL, close_fds=True, **kwargs)
+    with process.stdin:
+        for trash_dir in sorted(trash_dirs):
+            process.stdin.write(os.fsencode(str(trash_dir)) + b'\n')
+    logger.info(
+        f'Reaping {len(trash_dirs)} trash directories in background '
+        f'process {process.pid}')
+    return process.pid
+
+
+def reap_trash_dir(trash_dir):
+    """
+    Delete a trash directory and everything moved into it.
+
+    Failures are ignored since other reapers might process the same trash
+    directory concurrently and any leftovers are picked up again later.
+
+    :param trash_dir: The trash directory
+    """
+    try:
+        entries = list(os.scandir(trash_dir))
+    except OSError:
+        return
+    for entry in entries:
+        delete_path(Path(entry.path))
+    try:
+        os.rmdir(trash_dir)
+    except OSError:
+        pass
+
+
+def main(argv=None):
+    """
+    Reap the trash directories passed as arguments with a low priority.
+
+    Without arguments the trash directories are read from the standard
+    input, one per line.
+
+    :param argv: The trash directories, `None` to use `sys.argv`
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        argv = [
+            os.fsdecode(line)
+            for line in sys.stdin.buffer.read().splitlines() if line]
+    if hasattr(os, 'nice'):  # pragma: no branch
+        try:
+            # the I/O priority of the default scheduling class is derived
+            # from the CPU niceness
+            os.nice(19)
+        except OSError:  # pragma: no cover
+            pass
+    for trash_dir in argv:
+        reap_trash_dir(trash_dir)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -0,0 +1,148 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import os
+from pathlib import Path
+
+# the key of a trie node storing the path which ends at the node
+_PATH = None
+
+
+class PathTrie:
+    """
+    A set of paths which only keeps the outermost of nested paths.
+
+    Each node is a dictionary mapping the names of the path components to
+    the child nodes. A node where an added path ends stores the path and has
+    no children, since all paths below it are covered by the path.
+    Adding a path therefore takes time proportional to its length.
+    """
+
+    def __init__(self):  # noqa: D107
+        self._root = {}
+        self._count = 0
+
+    def add(self, path):
+        """
+        Add a path unless the path or one of its parents is already added.
+
+        Paths below the added path are removed from the trie.
+
+        :param path: The path to add
+        :returns: True if the path was added
+        :rtype: bool
+        """
+        node = self._root
+        for part in Path(path).parts:
+            if _PATH in node:
+                return False
+            node = node.setdefault(part, {})
+        if _PATH in node:
+            return False
+        if node:
+            self._count -= _count_paths(node)
+            node.clear()
+        node[_PATH] = path
+        self._count += 1
+        return True
+
+    def __len__(self):  # noqa: D105
+        return self._count
+
+    def __iter__(self):  # noqa: D105
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if _PATH in node:
+                yield node[_PATH]
+                continue
+            stack.extend(node.values())
+
+
+def _count_paths(node):
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if _PATH in node:
+            count += 1
+        else:
+            stack.extend(node.values())
+    return count
+
+
+def normalize_paths(paths):
+    """
+    Remove duplicate paths and paths below other paths.
+
+    :param paths: The paths
+    :returns: The outermost paths
+    :rtype: list
+    """
+    trie = PathTrie()
+    for path in paths:
+        trie.add(path)
+    return list(trie)
+
+
+def get_nested_paths(paths):
+    """
+    Get the paths which are below or above other paths.
+
+    :param paths: The paths
+    :returns: The nested paths and the paths containing them
+    :rtype: set
+    """
+    paths = {Path(path) for path in paths}
+    nested = set()
+    for path in paths:
+        for parent in path.parents:
+            if parent in paths:
+                nested.add(path)
+                nested.add(parent)
+    return nested
+
+
+# marks a directory without an enclosing path in the cache of an AncestorMap
+_MISSING = object()
+
+
+class AncestorMap:
+    """
+    Look up the value of the nearest of a set of paths enclosing a path.
+
+    The outcome is cached for the parent directory of each looked up path,
+    so looking up many paths within the same directories only takes a
+    single dictionary lookup each.
+    """
+
+    def __init__(self, mapping):  # noqa: D107
+        self._mapping = {str(path): value for path, value in mapping.items()}
+        self._cache = {}
+
+    def get(self, path, default=None):
+        """
+        Get the value of the path or of the nearest enclosing path.
+
+        :param path: The path
+        :param default: The value to return if no path encloses the path
+        :returns: The value of the enclosing path
+        """
+        path = str(path)
+        if path in self._mapping:
+            return self._mapping[path]
+        directory = os.path.dirname(path)
+        try:
+            value = self._cache[directory]
+        except KeyError:
+            value = self._cache[directory] = self._find(directory)
+        return default if value is _MISSING else value
+
+    def _find(self, directory):
+        while True:
+            if directory in self._mapping:
+                return self._mapping[directory]
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                return _MISSING
+            directory = parent
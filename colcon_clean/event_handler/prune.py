@@ -0,0 +1,160 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+
+from colcon_core.environment_variable import EnvironmentVariable
+from colcon_core.event.job import JobEnded
+from colcon_core.event_handler import EventHandlerExtensionPoint
+from colcon_core.event_reactor import EventReactorShutdown
+from colcon_core.logging import colcon_logger
+from colcon_core.plugin_system import satisfies_version
+from colcon_core.verb.build import BuildPackageArguments
+
+logger = colcon_logger.getChild(__name__)
+
+PRUNE_MATCH_ENVIRONMENT_VARIABLE = EnvironmentVariable(
+    'COLCON_CLEAN_PRUNE_MATCH',
+    'Set the patterns of paths to prune from the build directory of each '
+    'package once it has been built, separated by the path separator '
+    '(e.g. `*.o`)')
+
+PRUNE_IGNORE_ENVIRONMENT_VARIABLE = EnvironmentVariable(
+    'COLCON_CLEAN_PRUNE_IGNORE',
+    'Set the patterns of paths to keep in the build directory of each '
+    'package when pruning it, separated by the path separator '
+    '(e.g. `CMakeCache.txt`)')
+
+
+def get_prune_args(environ=None):
+    """
+    Get the clean filter arguments of the prune patterns.
+
+    :param environ: The environment variables, `os.environ` by default
+    :returns: The arguments as expected by `get_recursion_filter`
+    :rtype: argparse.Namespace
+    """
+    if environ is None:
+        environ = os.environ
+
+    def get_patterns(variable):
+        value = environ.get(variable.name, '')
+        return [
+            pattern for pattern in value.split(os.pathsep) if pattern
+        ] or None
+
+    return Namespace(
+        clean_match=get_patterns(PRUNE_MATCH_ENVIRONMENT_VARIABLE),
+        clean_ignore=get_patterns(PRUNE_IGNORE_ENVIRONMENT_VARIABLE),
+        clean_older_than=None,
+        clean_newer_than=None,
+        clean_larger_than=None,
+        clean_no_linked_dirs=True,
+        clean_no_linked_files=True)
+
+
+def prune_package(args, pkg, recursion_filter):
+    """
+    Prune the build directory of a package.
+
+    :param args: The arguments of the build base handler
+    :param pkg: The package descriptor
+    :param recursion_filter: The clean filter of the paths to prune
+    :rtype: CleanSummary
+    """
+    from colcon_clean.base_handler.build import BuildBaseHandler
+    from colcon_clean.clean.delete import delete_paths
+    from colcon_clean.subverb import scan_directory
+
+    base_handler = BuildBaseHandler()
+    paths = []
+    for package_path in base_handler.get_package_paths(args=args, pkg=pkg):
+        paths.extend(
+            scan_directory(Path(package_path).absolute(), recursion_filter))
+    return delete_paths(paths)
+
+
+class PruneEventHandler(EventHandlerExtensionPoint):
+    """
+    Prune the build directory of each package once it has been built.
+
+    The paths matching the patterns of the environment variables
+    `COLCON_CLEAN_PRUNE_MATCH` and `COLCON_CLEAN_PRUNE_IGNORE` are deleted
+    from the build directory of every package which has been built
+    successfully, e.g. object files which are no longer needed once the
+    package has been installed.
+    Since the deletion runs in a background thread the event reactor isn't
+    blocked, but the pending deletions are awaited on shutdown.
+
+    The extension is enabled by default if any patterns are set and handles
+    events of the following types:
+    - :py:class:`colcon_core.event.job.JobEnded`
+    - :py:class:`colcon_core.event_reactor.EventReactorShutdown`
+    """
+
+    def __init__(self):  # noqa: D107
+        super().__init__()
+        satisfies_version(
+            EventHandlerExtensionPoint.EXTENSION_POINT_VERSION, '^1.0')
+        self._args = get_prune_args()
+        self.enabled = bool(
+            self._args.clean_match or self._args.clean_ignore)
+        self._executor = None
+        self._futures = {}
+
+    def __call__(self, event):  # noqa: D102
+        data = event[0]
+
+        if isinstance(data, JobEnded):
+            job = event[1]
+            if data.rc or job is None:
+                return
+            task_context = getattr(job, 'task_context', None)
+            if task_context is None or \
+                    not isinstance(task_context.args, BuildPackageArguments):
+                return
+            self._prune(task_context)
+
+        elif isinstance(data, EventReactorShutdown):
+            self._wait()
+
+    def _prune(self, task_context):
+        from colcon_clean.subverb import get_recursion_filter
+
+        recursion_filter = get_recursion_filter(self._args)
+        if recursion_filter is None:
+            # without patterns the whole build directory would be deleted
+            logger.warning(
+                'Skipping pruning since neither '
+                f"'{PRUNE_MATCH_ENVIRONMENT_VARIABLE.name}' nor "
+                f"'{PRUNE_IGNORE_ENVIRONMENT_VARIABLE.name}' is set")
+            return
+        # the build base of the package arguments includes the package name
+        args = Namespace(
+            build_base=os.path.dirname(task_context.args.build_base))
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        pkg = task_context.pkg
+        self._futures[pkg.name] = self._executor.submit(
+            prune_package, args, pkg, recursion_filter)
+
+    def _wait(self):
+        if self._executor is None:
+            return
+        for pkg_name, future in self._futures.items():
+            try:
+                summary = future.result()
+            except Exception as e:  # noqa: B902
+                logger.error(f"Failed to prune package '{pkg_name}': {e}")
+                continue
+            for path, exc in summary.errors:
+                logger.warning(f"Skipping path: '{path}'")
+                logger.info(f"Skipping info: '{exc}'")
+            logger.info(
+                f"Pruned {summary.cleaned} paths of package '{pkg_name}'")
+        self._futures.clear()
+        self._executor.shutdown()
+        self._executor = None
@@ -2,19 +2,57 @@
 # Copyright 2021 Ruffin White
 # Licensed under the Apache License, Version 2.0
 
+from collections import Counter
+import hashlib
 import os
 from pathlib import Path
-import shutil
-
+import pydoc
+import sys
+import time
+
+from colcon_clean.clean.argument_type import duration
+from colcon_clean.clean.argument_type import positive_int
+from colcon_clean.clean.argument_type import size
+from colcon_clean.clean.delete import CleanSummary
+from colcon_clean.clean.delete import delete_paths
+from colcon_clean.clean.delete import delete_stream
+from colcon_clean.clean.delete import log_summary
+from colcon_clean.clean.delete import ObservedSummary
+from colcon_clean.clean.device import NETWORK_WORKERS_FACTOR
+from colcon_clean.clean.event import CleanScanned
+from colcon_clean.clean.event import EventSummary
+from colcon_clean.clean.event import get_job_identifiers
+from colcon_clean.clean.journal import CleanJournal
+from colcon_clean.clean.journal import JOURNAL_FILENAME
+from colcon_clean.clean.pipeline import ScanPipeline
+from colcon_clean.clean.plan import PathPlan
+from colcon_clean.clean.profiling import PhaseProfiler
+from colcon_clean.clean.profiling import PROFILE_FORMATS
 from colcon_clean.clean.query import query_yes_no
+from colcon_clean.clean.report import format_report
+from colcon_clean.clean.report import format_size
+from colcon_clean.clean.report import get_usage_report
+from colcon_clean.clean.report import REPORT_FORMATS
+from colcon_clean.clean.report import summarize_paths
+from colcon_clean.clean.scan import scan_tree
+from colcon_clean.clean.scan import ScanFilter
+from colcon_clean.clean.trash import find_trash_dirs
+from colcon_clean.clean.trash import move_paths_to_trash
+from colcon_clean.clean.trash import spawn_reaper
+from colcon_clean.clean.trie import AncestorMap
+from colcon_clean.clean.trie import normalize_paths
 from colcon_core.logging import colcon_logger
 from colcon_core.plugin_system import instantiate_extensions
 from colcon_core.plugin_system import order_extensions_by_name
-from scantree import RecursionFilter, scantree
 
 
 logger = colcon_logger.getChild(__name__)
 
+PREVIEW_PATHS = 20
+
+# the number of paths above which only a summary is listed
+SUMMARY_THRESHOLD = 100
+
 
 class CleanSubverbExtensionPoint:
     """
@@ -65,6 +103,90 @@ def add_clean_subverb_arguments(parser):
         action='store_true',
         help='Automatic yes to prompts')
 
+    group.add_argument(
+        '--clean-workers',
+        type=positive_int,
+        default=None,
+        metavar='N',
+        help='The maximum number of paths to delete concurrently per '
+             'device (default: number of CPUs)')
+
+    group.add_argument(
+        '--clean-network-workers',
+        type=positive_int,
+        default=None,
+        metavar='N',
+        help='The maximum number of paths to delete concurrently per '
+             'network file system, e.g. NFS '
+             f'(default: {NETWORK_WORKERS_FACTOR} times --clean-workers)')
+
+    group.add_argument(
+        '--clean-instant',
+        action='store_true',
+        help='Atomically move paths into a hidden trash directory on the '
+             'same filesystem and delete them in a detached low priority '
+             'background process')
+
+    group.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Only report the paths and the disk usage which would be '
+             'cleaned, without prompting or deleting anything')
+
+    group.add_argument(
+        '--report',
+        choices=REPORT_FORMATS,
+        default=None,
+        help='Report the number of files and the disk usage of the cleaned '
+             'paths by base and package (default: text for --dry-run)')
+
+    group.add_argument(
+        '--report-file',
+        type=Path,
+        default=None,
+        metavar='PATH',
+        help='Write the report to a file instead of printing it along with '
+             'the other output (default format: json)')
+
+    group.add_argument(
+        '--clean-verbose',
+        action='store_true',
+        help='List every path before prompting instead of a summary by '
+             f'base and package for more than {SUMMARY_THRESHOLD} paths, '
+             'using a pager if the output is a terminal')
+
+    group.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue an interrupted clean with the remaining paths of its '
+             'journal next to the build base instead of scanning again')
+
+    group.add_argument(
+        '--plan-out',
+        type=Path,
+        default=None,
+        metavar='PATH',
+        help='Only save the paths to clean to a plan file instead of '
+             'cleaning them')
+
+    group.add_argument(
+        '--plan-in',
+        type=Path,
+        default=None,
+        metavar='PATH',
+        help='Clean the paths of a plan file saved with --plan-out which '
+             'are unchanged since, without discovering packages or scanning')
+
+    group.add_argument(
+        '--clean-profile',
+        nargs='?',
+        choices=PROFILE_FORMATS,
+        const='summary',
+        default=None,
+        help='Print the wall time, CPU time and number of paths of each '
+             'phase, and optionally write a cProfile dump or a Chrome trace '
+             'to the log directory (default: summary)')
+
     filter_options = parser.add_argument_group(
         title='Clean filter arguments',
         description='Specify what files and directories to include. All '
@@ -101,6 +223,33 @@ def add_clean_subverb_arguments(parser):
         'asterisk preceded by an escape character (\\*).',
         metavar=''
     )
+    filter_options.add_argument(
+        '--clean-older-than',
+        type=duration,
+        default=None,
+        metavar='DURATION',
+        help='Only include files last modified longer ago than the given '
+        'duration, e.g. 14d. Directories are descended into instead of '
+        'being included as a whole.'
+    )
+    filter_options.add_argument(
+        '--clean-newer-than',
+        type=duration,
+        default=None,
+        metavar='DURATION',
+        help='Only include files last modified within the given duration, '
+        'e.g. 12h. Directories are descended into instead of being '
+        'included as a whole.'
+    )
+    filter_options.add_argument(
+        '--clean-larger-than',
+        type=size,
+        default=None,
+        metavar='SIZE',
+        help='Only include files larger than the given size, e.g. 100M. '
+        'Directories are descended into instead of being included as a '
+        'whole.'
+    )
     filter_options.add_argument(
         '--clean-no-linked-dirs',
         action='store_false',
@@ -111,60 +260,89 @@ def add_clean_subverb_arguments(parser):
         action='store_false',
         help='Do not include symbolic links to files.'
     )
+    filter_options.add_argument(
+        '--clean-index',
+        action='store_true',
+        help='Persist the scan of each base path in a hidden index, so '
+        'repeated scans with the same patterns only list the directories '
+        'which have changed since.'
+    )
     filter_options.set_defaults(
         clean_no_linked_dirs=True,
         clean_no_linked_files=True,
     )
 
 
-def scan_directory(directory, recursion_filter):
+def scan_directory(
+    directory, recursion_filter, use_index=False, event_publisher=None,
+    group=None, cancelled=None,
+):
     """
     Scan directory with recursion filter.
 
-    The recursion filter includes match patterns or is None.
+    The recursion filter includes match patterns or is None. If an event
+    publisher is given, a `CleanScanned` event is published for the jobs of
+    the group once the scan is complete.
 
     :param directory: Path
-    :param recursion_filter: RecursionFilter
+    :param recursion_filter: ScanFilter
+    :param use_index: bool
+    :param event_publisher: EventPublisher or None
+    :param group: (base_name, pkg_name) tuple or None
+    :param cancelled: threading.Event to stop scanning or None
 
-    :rtype: list
+    :returns: A generator of paths
     """
-    base_paths = set()
     if not directory.exists():
-        return base_paths
+        return
 
+    start_time = time.monotonic()
+    count = 0
     if recursion_filter:
-        tree = scantree(
-            directory=directory,
-            recursion_filter=recursion_filter,
-            follow_links=False,
-            include_empty=True)
-        for filepath in tree.filepaths():
-            filepath = Path(filepath)
-            if directory in filepath.parents:  # pragma: no branch
-                base_paths.add(filepath)
+        for path in scan_tree(
+            directory, recursion_filter, use_index=use_index,
+            cancelled=cancelled,
+        ):
+            count += 1
+            yield path
     else:
-        base_paths.add(directory)
-    return base_paths
+        count += 1
+        yield directory
+
+    if event_publisher is not None:
+        elapsed = time.monotonic() - start_time
+        for identifier in get_job_identifiers(group):
+            event_publisher.put(CleanScanned(identifier, count, elapsed))
 
 
 def get_recursion_filter(args):
     """
     Get the recursion filter.
 
-    The recursion filter includes match patterns or is None.
+    The recursion filter includes match patterns and age or size filters,
+    or is None.
 
     :param args: The parsed command line arguments
 
-    :rtype: RecursionFilter or None
+    :rtype: ScanFilter or None
     """
-    if args.clean_match or args.clean_ignore:
-        match_patterns = get_match_patterns(
-            match=args.clean_match,
-            ignore=args.clean_ignore)
-        recursion_filter = RecursionFilter(
+    uses_stat = (
+        args.clean_older_than is not None or
+        args.clean_newer_than is not None or
+        args.clean_larger_than is not None)
+    if args.clean_match or args.clean_ignore or uses_stat:
+        match_patterns = None
+        if args.clean_match or args.clean_ignore:
+            match_patterns = get_match_patterns(
+                match=args.clean_match,
+                ignore=args.clean_ignore)
+        recursion_filter = ScanFilter(
             linked_dirs=args.clean_no_linked_dirs,
             linked_files=args.clean_no_linked_files,
-            match=match_patterns
+            match=match_patterns,
+            older_than=args.clean_older_than,
+            newer_than=args.clean_newer_than,
+            larger_than=args.clean_larger_than,
         )
         return recursion_filter
     return None
@@ -216,56 +394,457 @@ def get_subverb_extensions():
     return order_extensions_by_name(extensions)
 
 
-def clean_paths(paths, confirmed=False):
+def clean_paths(
+    paths, confirmed=False, workers=None, instant=False, dry_run=False,
+    report=None, groups=None, event_publisher=None, profiler=None,
+    verbose=False, network_workers=None, journal=None, resume=False,
+    observers=None, report_file=None, base_paths=None,
+):
     """
     Clean provided paths with conformation.
 
-    :paths: list
+    If a journal is given, the paths are recorded in it before they are
+    cleaned and each cleaned path is appended to it, so an interrupted clean
+    can be resumed. The journal is removed once all paths have been cleaned.
+
+    :paths: list or PathPlan
     :confirmed: bool
+    :workers: int or None
+    :instant: bool
+    :dry_run: bool
+    :report: str or None
+    :groups: dict mapping paths to (base_name, pkg_name) tuples or None
+    :event_publisher: EventPublisher or None
+    :profiler: PhaseProfiler or None
+    :verbose: bool
+    :network_workers: int or None
+    :journal: CleanJournal or None
+    :resume: bool, if the paths are the remaining paths of the journal
+    :observers: list of objects whose `add(path, errors)` method is called
+      for every cleaned path, or None
+    :report_file: Path to write the report to instead of printing it, or
+      None
+    :base_paths: list of the base directories of the paths or None
+    :rtype: CleanSummary or None
     """
+    if profiler is None:
+        profiler = PhaseProfiler()
+    # e.g. the build and test_result bases share the same path by default
+    if isinstance(paths, PathPlan):
+        paths.remove_nested()
+    else:
+        paths = normalize_paths(paths)
+    cwd_path = Path.cwd()
+    if instant and not dry_run:
+        # resume reaping trash left behind by interrupted reapers
+        leftover_trash_dirs = find_trash_dirs(
+            {cwd_path} | {path.parent for path in paths})
+        if leftover_trash_dirs:
+            spawn_reaper(leftover_trash_dirs)
+
     if not paths:
         message = 'No paths cleaned.'
         logger.info(message)
         print(message)
-        return
+        return None
+
+    if report_file is not None and report is None:
+        report = 'json'
+    if dry_run and report is None:
+        report = 'text'
+    usage_report = None
+    if report:
+        with profiler.phase('report') as phase:
+            usage_report = get_usage_report(
+                paths, groups=groups, workers=workers)
+            phase.paths = len(paths)
+
+    if dry_run:
+        if report == 'text':
+            list_paths(
+                paths, cwd_path, groups=groups, usage_report=usage_report,
+                verbose=verbose, base_paths=base_paths)
+        write_report(usage_report, report, report_file, dry_run=True)
+        return None
 
-    cwd_path = Path.cwd()
     if not confirmed:
-        print('Paths:')
-        relpaths = (os.path.relpath(path, cwd_path) for path in paths)
-        for path in sorted(relpaths):
-            print('    ', path)
-        question = 'Clean the above paths?'
-        confirmed = query_yes_no(question)
+        with profiler.phase('confirm') as phase:
+            list_paths(
+                paths, cwd_path, groups=groups, usage_report=usage_report,
+                verbose=verbose, base_paths=base_paths)
+            question = 'Clean the above paths?'
+            confirmed = query_yes_no(question)
+            phase.paths = len(paths)
 
-    if confirmed:
-        for path in sorted(paths):
-            _clean_path(path)
+    if not confirmed:
+        return None
 
+    if event_publisher is not None:
+        summary = EventSummary(
+            event_publisher, paths, groups=groups, usage_report=usage_report)
+    else:
+        summary = CleanSummary()
+    observers = list(observers or ())
+    if journal is not None:
+        with profiler.phase('journal') as phase:
+            if journal.start(None if resume else paths, groups=groups):
+                observers.append(journal)
+            phase.paths = 0 if resume else len(paths)
+    recorder = summary
+    if observers:
+        recorder = ObservedSummary(summary, observers)
+    finished = False
+    try:
+        if instant:
+            with profiler.phase('trash') as phase:
+                paths, trash_dirs = move_paths_to_trash(
+                    paths, summary=recorder)
+                if trash_dirs:
+                    spawn_reaper(trash_dirs)
+                phase.paths = summary.cleaned
+        with profiler.phase('delete') as phase:
+            cleaned = summary.cleaned
+            delete_paths(
+                paths, workers=workers, summary=recorder,
+                network_workers=network_workers)
+            phase.paths = summary.cleaned - cleaned
+        finished = not summary.errors
+    finally:
+        if journal is not None:
+            journal.close(finished=finished)
+    log_summary(summary)
+    if usage_report:
+        write_report(usage_report, report, report_file)
+    return summary
+
+
+def get_clean_journal(args, workspaces=None):
+    """
+    Get the journal of the cleans of the workspace of the build base.
 
-def _onerror(func, path, excinfo):  # pragma: no cover
-    if excinfo[0] in (OSError, PermissionError):  # pragma: no branch
-        logger.warning(f"Skipping path: '{path}'")
-        logger.info(f"Skipping info: '{excinfo[1]}'")
-        return
-    raise
+    The journal is stored next to the build base instead of in any of the
+    bases, e.g. the log base, since it would be deleted along with them by a
+    clean of all bases. Cleans of other workspaces get a journal of their
+    own, named after their workspace patterns.
 
+    :args: The parsed command line arguments
+    :workspaces: list of the patterns of the other workspaces or None
+    :rtype: CleanJournal
+    """
+    workspace_path = Path(os.path.abspath(args.build_base)).parent
+    if not workspaces:
+        return CleanJournal(workspace_path / JOURNAL_FILENAME)
+    patterns = sorted({os.path.abspath(pattern) for pattern in workspaces})
+    digest = hashlib.sha256('\n'.join(patterns).encode()).hexdigest()[:12]
+    stem, suffix = os.path.splitext(JOURNAL_FILENAME)
+    return CleanJournal(workspace_path / f'{stem}.{digest}{suffix}')
 
-def _onexc(func, path, excinfo):  # pragma: no cover
-    if isinstance(excinfo, (PermissionError, OSError)):  # pragma: no branch
-        logger.warning(f"Skipping path: '{path}'")
-        logger.info(f"Skipping info: '{excinfo}'")
-        return
-    raise
 
+def resume_clean_paths(args, journal, event_publisher=None, profiler=None):
+    """
+    Continue an interrupted clean with the remaining paths of its journal.
+
+    :args: The parsed command line arguments
+    :journal: CleanJournal
+    :event_publisher: EventPublisher or None
+    :profiler: PhaseProfiler or None
+    :returns: The return code, non-zero if the journal can't be loaded
+    :rtype: int
+    """
+    if profiler is None:
+        profiler = PhaseProfiler()
+    if not journal.exists():
+        message = 'No interrupted clean to resume.'
+        logger.info(message)
+        print(message)
+        return 0
+    with profiler.phase('resume') as phase:
+        try:
+            path_plan = journal.load()
+        except (OSError, ValueError) as e:
+            logger.error(
+                f"Failed to load clean journal '{journal.path}': {e}")
+            return 1
+        phase.paths = len(path_plan)
+    logger.info(
+        f"Resuming clean of {len(path_plan)} paths from '{journal.path}'")
+    if not path_plan:
+        journal.close(finished=True)
+    clean_path_plan(
+        args, path_plan, journal=journal, resume=True,
+        event_publisher=event_publisher, profiler=profiler)
+    return 0
+
+
+def save_clean_plan(args, path_plan, profiler=None):
+    """
+    Save the paths to clean instead of cleaning them.
 
-def _clean_path(path):
-    logger.info(f"Cleaning path: '{path}'")
-    if path.is_dir():
+    :args: The parsed command line arguments
+    :path_plan: PathPlan
+    :profiler: PhaseProfiler or None
+    :rtype: int
+    """
+    if profiler is None:
+        profiler = PhaseProfiler()
+    path_plan.remove_nested()
+    with profiler.phase('save') as phase:
+        count = path_plan.save(args.plan_out)
+        phase.paths = count
+    message = f"Saved plan of {count} paths to '{args.plan_out}'"
+    logger.info(message)
+    print(message)
+    return count
+
+
+def clean_saved_plan(args, journal, event_publisher=None, profiler=None):
+    """
+    Clean the paths of a saved plan which haven't changed since.
+
+    :args: The parsed command line arguments
+    :journal: CleanJournal
+    :event_publisher: EventPublisher or None
+    :profiler: PhaseProfiler or None
+    :returns: The return code, non-zero if the plan can't be loaded
+    :rtype: int
+    """
+    if profiler is None:
+        profiler = PhaseProfiler()
+    with profiler.phase('load') as phase:
         try:
-            shutil.rmtree(path, onexc=_onexc)
-        except TypeError:
-            # TODO: Remove when minimum python version is 3.12
-            shutil.rmtree(path, onerror=_onerror)
+            path_plan, skipped = PathPlan.load(args.plan_in)
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to load clean plan '{args.plan_in}': {e}")
+            return 1
+        phase.paths = len(path_plan) + skipped
+    if skipped:
+        message = \
+            f'Skipping {skipped} paths which have changed since planning'
+        logger.warning(message)
+    clean_path_plan(
+        args, path_plan, journal=journal,
+        event_publisher=event_publisher, profiler=profiler)
+    return 0
+
+
+def clean_path_plan(
+    args, path_plan, journal=None, resume=False, event_publisher=None,
+    profiler=None,
+):
+    """
+    Clean the paths of a plan according to the command line arguments.
+
+    :args: The parsed command line arguments
+    :path_plan: PathPlan
+    :journal: CleanJournal or None
+    :resume: bool
+    :event_publisher: EventPublisher or None
+    :profiler: PhaseProfiler or None
+    :rtype: CleanSummary or None
+    """
+    return clean_paths(
+        paths=path_plan,
+        confirmed=args.yes,
+        workers=args.clean_workers,
+        instant=args.clean_instant,
+        dry_run=args.dry_run,
+        report=args.report,
+        report_file=args.report_file,
+        groups=path_plan,
+        event_publisher=event_publisher,
+        profiler=profiler,
+        verbose=args.clean_verbose,
+        network_workers=args.clean_network_workers,
+        journal=journal,
+        resume=resume)
+
+
+def write_report(usage_report, report, report_file=None, dry_run=False):
+    """
+    Print a usage report or write it to a file.
+
+    Writing the report to a file keeps it apart from the other output, e.g.
+    the progress of event handlers, so a JSON report can be parsed.
+
+    :usage_report: UsageReport
+    :report: str
+    :report_file: Path or None
+    :dry_run: bool
+    """
+    content = format_report(
+        usage_report, report_format=report, dry_run=dry_run)
+    if report_file is None:
+        print(content)
+        return
+    try:
+        Path(report_file).write_text(content + '\n')
+    except OSError as e:
+        logger.warning(f"Failed to write report '{report_file}': {e}")
+        print(content)
+        return
+    logger.info(f"Wrote report to '{report_file}'")
+
+
+def list_paths(
+    paths, cwd_path, groups=None, usage_report=None, verbose=False,
+    base_paths=None,
+):
+    """
+    List paths or a summary of them for many paths.
+
+    :paths: list
+    :cwd_path: Path
+    :groups: dict mapping paths to (base_name, pkg_name) tuples or None
+    :usage_report: UsageReport or None
+    :verbose: bool
+    :base_paths: list of the base directories of the paths or None
+    """
+    if len(paths) <= SUMMARY_THRESHOLD:
+        print_paths(paths, cwd_path)
+    elif not verbose:
+        print_paths_summary(
+            paths, cwd_path, groups, usage_report, base_paths=base_paths)
+    elif sys.stdout.isatty():
+        relpaths = (os.path.relpath(path, cwd_path) for path in paths)
+        pydoc.pager('Paths:\n' + ''.join(
+            f'     {path}\n' for path in sorted(relpaths)))
     else:
-        path.unlink()
+        print_paths(paths, cwd_path)
+
+
+def print_paths_summary(
+    paths, cwd_path, groups=None, usage_report=None, base_paths=None,
+):
+    """
+    Print the number of paths by base and package.
+
+    The disk usage of a base is only printed if its paths are summarized
+    together, as it is not reported per path component below the base.
+
+    :paths: list
+    :cwd_path: Path
+    :groups: dict mapping paths to (base_name, pkg_name) tuples or None
+    :usage_report: UsageReport or None
+    :base_paths: list of the base directories of the paths or None
+    """
+    print('Paths:')
+    entries = summarize_paths(paths, groups=groups, base_paths=base_paths)
+    base_entries = Counter(
+        base_name for _, base_name, pkg_name, _ in entries
+        if pkg_name is None)
+    for directory, base_name, pkg_name, count in entries:
+        details = f'{count} paths' if count != 1 else '1 path'
+        usage = None
+        if usage_report is not None and base_name is not None:
+            if pkg_name is None:
+                if base_entries[base_name] == 1:
+                    usage = usage_report.bases.get(base_name)
+            else:
+                usage = usage_report.packages.get(base_name, {}) \
+                    .get(pkg_name)
+        if usage is not None:
+            details += f', {format_size(usage.bytes)}'
+        print('    ', os.path.relpath(directory, cwd_path), f'({details})')
+    print(
+        f'Summarized {len(paths)} paths, use --clean-verbose to list all '
+        'of them')
+
+
+def print_paths(paths, cwd_path):
+    """
+    Print paths relative to the current working directory.
+
+    :paths: list
+    :cwd_path: Path
+    """
+    print('Paths:')
+    relpaths = (os.path.relpath(path, cwd_path) for path in paths)
+    for path in sorted(relpaths):
+        print('    ', path)
+
+
+def clean_paths_pipelined(
+    directories, recursion_filter, confirmed=False, workers=None,
+    use_index=False, event_publisher=None, profiler=None, observers=None,
+    groups=None,
+):
+    """
+    Scan directories concurrently and clean paths as they are found.
+
+    Without confirmation only a preview of the first paths is shown before
+    asking, and the remaining paths are printed while they are cleaned.
+
+    :directories: list
+    :recursion_filter: ScanFilter or None
+    :confirmed: bool
+    :workers: int or None
+    :use_index: bool
+    :event_publisher: EventPublisher or None
+    :profiler: PhaseProfiler or None
+    :observers: list or None
+    :groups: dict mapping directories to (base_name, pkg_name) tuples or
+      None
+    :rtype: CleanSummary or None
+    """
+    if profiler is None:
+        profiler = PhaseProfiler()
+    pipeline = ScanPipeline(
+        directories,
+        lambda directory, cancelled: scan_directory(
+            directory, recursion_filter, use_index=use_index,
+            cancelled=cancelled),
+        workers=workers)
+    try:
+        with profiler.phase('preview') as phase:
+            preview, complete = pipeline.peek(PREVIEW_PATHS)
+            phase.paths = len(preview)
+        if not preview:
+            message = 'No paths cleaned.'
+            logger.info(message)
+            print(message)
+            return None
+
+        cwd_path = Path.cwd()
+        paths = pipeline
+        if not confirmed:
+            with profiler.phase('confirm') as phase:
+                print_paths(preview, cwd_path)
+                if complete:
+                    question = 'Clean the above paths?'
+                else:
+                    print('     ...')
+                    question = \
+                        'Clean the above paths and all further matches?'
+                confirmed = query_yes_no(question)
+                phase.paths = len(preview)
+            if not confirmed:
+                return None
+            if not complete:
+                paths = _print_further_paths(pipeline, preview, cwd_path)
+
+        if event_publisher is not None:
+            # the found paths are grouped by their enclosing directory
+            summary = EventSummary(
+                event_publisher,
+                groups=AncestorMap(groups) if groups else None)
+        else:
+            summary = CleanSummary()
+        recorder = summary
+        if observers:
+            recorder = ObservedSummary(summary, observers)
+        with profiler.phase('delete') as phase:
+            delete_stream(paths, workers=workers, summary=recorder)
+            phase.paths = summary.cleaned
+    finally:
+        pipeline.cancel()
+        pipeline.close()
+    log_summary(summary)
+    return summary
+
+
+def _print_further_paths(paths, preview, cwd_path):
+    preview = set(preview)
+    for path in paths:
+        if path not in preview:
+            print('    ', os.path.relpath(path, cwd_path))
+        yield path
@@ -0,0 +1,184 @@
+# Copyright 2016-2018 Dirk Thomas
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import os
+from pathlib import Path
+
+from colcon_clean.base_handler \
+    import add_base_handler_arguments, get_base_handler_extensions
+from colcon_clean.clean.event import EventPublisher
+from colcon_clean.clean.plan import PathPlan
+from colcon_clean.clean.profiling import PhaseProfiler
+from colcon_clean.subverb import (
+    add_clean_subverb_arguments,
+    clean_paths,
+    clean_saved_plan,
+    CleanSubverbExtensionPoint,
+    get_clean_journal,
+    get_recursion_filter,
+    resume_clean_paths,
+    save_clean_plan,
+    scan_directory,
+)
+from colcon_core.event_handler import add_event_handler_arguments
+from colcon_core.event_reactor import create_event_reactor
+from colcon_core.package_discovery import add_package_discovery_arguments
+from colcon_core.package_discovery import discover_packages
+from colcon_core.package_identification \
+    import get_package_identification_extensions
+from colcon_core.plugin_system import satisfies_version
+from colcon_core.verb import check_and_mark_build_tool
+from colcon_core.verb import logger
+
+INSTALL_LAYOUT_MARKER = '.colcon_install_layout'
+
+
+class OrphansCleanSubverb(CleanSubverbExtensionPoint):
+    """Clean paths of packages no longer in workspace."""
+
+    def __init__(self):  # noqa: D107
+        super().__init__()
+        satisfies_version(
+            CleanSubverbExtensionPoint.EXTENSION_POINT_VERSION, '^1.0')
+
+    def add_arguments(self, *, parser):  # noqa: D102
+        add_clean_subverb_arguments(parser)
+        add_base_handler_arguments(parser)
+        add_event_handler_arguments(parser)
+        add_package_discovery_arguments(parser)
+
+    def main(self, *, context):  # noqa: D102
+        check_and_mark_build_tool(context.args.build_base)
+
+        args = context.args
+        with PhaseProfiler(args.clean_profile) as profiler, \
+                create_event_reactor(context) as event_reactor:
+            event_publisher = EventPublisher(
+                event_reactor.get_queue(), args)
+            with profiler.phase('extensions'):
+                base_handler_extensions = get_base_handler_extensions()
+                recursion_filter = get_recursion_filter(args)
+
+            journal = get_clean_journal(args)
+            if args.resume:
+                return resume_clean_paths(
+                    args, journal, event_publisher=event_publisher,
+                    profiler=profiler)
+            if args.plan_in:
+                return clean_saved_plan(
+                    args, journal, event_publisher=event_publisher,
+                    profiler=profiler)
+
+            with profiler.phase('packages') as phase:
+                descriptors = discover_packages(
+                    args, get_package_identification_extensions())
+                orphan_path_groups = get_orphan_path_groups(
+                    args, base_handler_extensions, descriptors)
+                phase.paths = len(orphan_path_groups)
+
+            path_plan = PathPlan()
+            with profiler.phase('scan') as phase:
+                for orphan_path, group in orphan_path_groups.items():
+                    for path in scan_directory(
+                        orphan_path, recursion_filter,
+                        event_publisher=event_publisher, group=group,
+                    ):
+                        path_plan.add(path, group)
+                phase.paths = len(path_plan)
+
+            if args.plan_out:
+                save_clean_plan(args, path_plan, profiler=profiler)
+                return 0
+
+            clean_paths(
+                paths=path_plan,
+                confirmed=args.yes,
+                workers=args.clean_workers,
+                instant=args.clean_instant,
+                dry_run=args.dry_run,
+                report=args.report,
+                report_file=args.report_file,
+                groups=path_plan,
+                event_publisher=event_publisher,
+                profiler=profiler,
+                verbose=args.clean_verbose,
+                network_workers=args.clean_network_workers,
+                journal=journal)
+
+        return 0
+
+
+def get_orphan_path_groups(args, base_handler_extensions, descriptors):
+    """
+    Get the orphaned package directories of the selected bases.
+
+    :param args: The parsed command line arguments
+    :param base_handler_extensions: The base handler extensions by name
+    :param descriptors: The discovered package descriptors
+    :returns: The mapping of absolute orphan paths to
+      `(base_name, pkg_name)` tuples
+    :rtype: dict
+    """
+    orphan_path_groups = {}
+    for base_name in args.base_select:
+        if base_name in args.base_ignore:
+            logger.info(
+                f"Ignoring base handler for selection '{base_name}'")
+            continue
+        base_handler_extension = base_handler_extensions[base_name]
+        package_paths = set()
+        for pkg in descriptors:
+            package_paths.update(
+                Path(package_path).absolute()
+                for package_path in base_handler_extension
+                .get_package_paths(args=args, pkg=pkg))
+        if not package_paths:
+            logger.info(
+                'Skipping base handler without package paths '
+                f"'{base_name}'")
+            continue
+        workspace_paths = \
+            base_handler_extension.get_workspace_paths(args=args)
+        for workspace_path in workspace_paths:
+            workspace_path = Path(workspace_path).absolute()
+            for orphan_path in get_orphan_paths(
+                workspace_path, package_paths
+            ):
+                orphan_path_groups.setdefault(
+                    orphan_path, (base_name, orphan_path.name))
+    return orphan_path_groups
+
+
+def get_orphan_paths(workspace_path, package_paths):
+    """
+    Get the package directories of a base without a discovered package.
+
+    The top level of the base is listed once and the directory names are
+    compared to the package paths within the base. Hidden entries, files and
+    bases using a merged install layout are skipped.
+
+    :param workspace_path: The absolute base path
+    :param package_paths: The absolute package paths of all discovered
+      packages
+    :rtype: list
+    """
+    try:
+        with open(workspace_path / INSTALL_LAYOUT_MARKER) as h:
+            if h.read().strip() == 'merged':
+                logger.info(
+                    f"Skipping merged install layout '{workspace_path}'")
+                return []
+    except OSError:
+        pass
+
+    try:
+        with os.scandir(workspace_path) as entries:
+            names = {
+                entry.name for entry in entries
+                if not entry.name.startswith('.') and entry.is_dir()}
+    except OSError:
+        return []
+    pkg_names = {
+        path.name for path in package_paths if path.parent == workspace_path}
+    return [workspace_path / name for name in sorted(names - pkg_names)]
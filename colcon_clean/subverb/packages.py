@@ -6,14 +6,27 @@ from pathlib import Path
 
 from colcon_clean.base_handler \
     import add_base_handler_arguments, get_base_handler_extensions
+from colcon_clean.clean.argument_type import size
+from colcon_clean.clean.budget import get_last_build_time
+from colcon_clean.clean.budget import select_packages_to_evict
+from colcon_clean.clean.event import EventPublisher
+from colcon_clean.clean.plan import PathPlan
+from colcon_clean.clean.profiling import PhaseProfiler
+from colcon_clean.clean.report import get_usage_report
 from colcon_clean.subverb import (
     add_clean_subverb_arguments,
     clean_paths,
+    clean_paths_pipelined,
+    clean_saved_plan,
     CleanSubverbExtensionPoint,
+    get_clean_journal,
     get_recursion_filter,
+    resume_clean_paths,
+    save_clean_plan,
     scan_directory,
 )
 from colcon_core.event_handler import add_event_handler_arguments
+from colcon_core.event_reactor import create_event_reactor
 from colcon_core.package_selection import add_arguments \
     as add_packages_arguments
 from colcon_core.package_selection import get_packages
@@ -32,6 +45,19 @@ class PackagesCleanSubverb(CleanSubverbExtensionPoint):
 
     def add_arguments(self, *, parser):  # noqa: D102
         add_clean_subverb_arguments(parser)
+        parser.add_argument(
+            '--max-size',
+            type=size,
+            default=None,
+            metavar='SIZE',
+            help='Only clean the least recently built packages until the '
+                 'selected paths of all packages fit the given size, '
+                 'e.g. 50G')
+        parser.add_argument(
+            '--clean-pipeline',
+            action='store_true',
+            help='Scan packages concurrently and clean paths as they are '
+                 'found, only previewing the first paths before prompting')
         add_base_handler_arguments(parser)
         add_event_handler_arguments(parser)
         add_packages_arguments(parser)
@@ -39,33 +65,154 @@ class PackagesCleanSubverb(CleanSubverbExtensionPoint):
     def main(self, *, context):  # noqa: D102
         check_and_mark_build_tool(context.args.build_base)
 
-        base_handler_extensions = get_base_handler_extensions()
-        base_paths = set()
-
         args = context.args
-        decorators = get_packages(args)
-        recursion_filter = get_recursion_filter(args)
+        with PhaseProfiler(args.clean_profile) as profiler, \
+                create_event_reactor(context) as event_reactor:
+            event_publisher = EventPublisher(
+                event_reactor.get_queue(), args)
+            with profiler.phase('extensions'):
+                base_handler_extensions = get_base_handler_extensions()
+                recursion_filter = get_recursion_filter(args)
 
-        for base_name in args.base_select:
-            if base_name in args.base_ignore:
-                logger.info(
-                    f"Ignoring base handler for selection '{base_name}'")
-                continue
-            base_handler_extension = base_handler_extensions[base_name]
-            for decorator in decorators:
-                if not decorator.selected:
-                    continue
-                pkg = decorator.descriptor
-                package_paths = \
-                    base_handler_extension.get_package_paths(
-                        args=args, pkg=pkg)
-                for package_path in package_paths:
-                    package_path = Path(package_path).absolute()
-                    base_paths.update(
-                        scan_directory(package_path, recursion_filter))
-
-        clean_paths(
-            paths=base_paths,
-            confirmed=args.yes)
+            journal = get_clean_journal(args)
+            if args.resume:
+                return resume_clean_paths(
+                    args, journal, event_publisher=event_publisher,
+                    profiler=profiler)
+            if args.plan_in:
+                return clean_saved_plan(
+                    args, journal, event_publisher=event_publisher,
+                    profiler=profiler)
+
+            with profiler.phase('packages') as phase:
+                decorators = get_packages(args)
+                package_path_groups = get_package_path_groups(
+                    args, base_handler_extensions, decorators)
+                phase.paths = len(package_path_groups)
+
+            if args.clean_pipeline:
+                if (
+                    args.dry_run or args.report or args.report_file or
+                    args.clean_instant or
+                    args.max_size is not None or args.plan_out
+                ):
+                    logger.warning(
+                        'Ignoring --clean-pipeline since it requires all '
+                        'paths to be scanned before cleaning')
+                else:
+                    clean_paths_pipelined(
+                        directories=list(package_path_groups.keys()),
+                        recursion_filter=recursion_filter,
+                        confirmed=args.yes,
+                        workers=args.clean_workers,
+                        use_index=args.clean_index,
+                        event_publisher=event_publisher,
+                        profiler=profiler,
+                        groups=package_path_groups)
+                    return 0
+
+            path_plan = PathPlan()
+            with profiler.phase('scan') as phase:
+                for package_path, group in package_path_groups.items():
+                    for path in scan_directory(
+                        package_path, recursion_filter,
+                        use_index=args.clean_index,
+                        event_publisher=event_publisher, group=group,
+                    ):
+                        path_plan.add(path, group)
+                phase.paths = len(path_plan)
+
+            if args.max_size is not None:
+                with profiler.phase('evict') as phase:
+                    path_plan = get_evicted_paths(
+                        path_plan, max_size=args.max_size,
+                        build_base=args.build_base,
+                        workers=args.clean_workers)
+                    phase.paths = len(path_plan)
+
+            if args.plan_out:
+                save_clean_plan(args, path_plan, profiler=profiler)
+                return 0
+
+            clean_paths(
+                paths=path_plan,
+                confirmed=args.yes,
+                workers=args.clean_workers,
+                instant=args.clean_instant,
+                dry_run=args.dry_run,
+                report=args.report,
+                report_file=args.report_file,
+                groups=path_plan,
+                event_publisher=event_publisher,
+                profiler=profiler,
+                verbose=args.clean_verbose,
+                network_workers=args.clean_network_workers,
+                journal=journal)
 
         return 0
+
+
+def get_package_path_groups(args, base_handler_extensions, decorators):
+    """
+    Get the package paths of the selected bases and packages.
+
+    :param args: The parsed command line arguments
+    :param base_handler_extensions: The base handler extensions by name
+    :param decorators: The package decorators
+    :returns: The mapping of absolute package paths to
+      `(base_name, pkg_name)` tuples
+    :rtype: dict
+    """
+    package_path_groups = {}
+    for base_name in args.base_select:
+        if base_name in args.base_ignore:
+            logger.info(
+                f"Ignoring base handler for selection '{base_name}'")
+            continue
+        base_handler_extension = base_handler_extensions[base_name]
+        for decorator in decorators:
+            if not decorator.selected:
+                continue
+            pkg = decorator.descriptor
+            package_paths = \
+                base_handler_extension.get_package_paths(
+                    args=args, pkg=pkg)
+            for package_path in package_paths:
+                package_path = Path(package_path).absolute()
+                package_path_groups.setdefault(
+                    package_path, (base_name, pkg.name))
+    return package_path_groups
+
+
+def get_evicted_paths(path_plan, *, max_size, build_base, workers=None):
+    """
+    Get the paths of the least recently built packages exceeding a budget.
+
+    :param path_plan: The plan of the paths and their `(base_name, pkg_name)`
+      groups, where paths below other paths are removed
+    :param max_size: The maximum number of bytes to keep
+    :param build_base: The base path for all build directories
+    :param workers: The number of concurrent workers, `None` to use the
+      number of CPUs
+    :rtype: PathPlan
+    """
+    path_plan.remove_nested()
+    report = get_usage_report(path_plan, groups=path_plan, workers=workers)
+    package_sizes = {}
+    for packages in report.packages.values():
+        for pkg_name, usage in packages.items():
+            package_sizes[pkg_name] = \
+                package_sizes.get(pkg_name, 0) + usage.bytes
+    last_build_times = {
+        pkg_name: get_last_build_time(build_base, pkg_name)
+        for pkg_name in package_sizes.keys()}
+    evicted = set(select_packages_to_evict(
+        package_sizes, last_build_times, max_size))
+    logger.info(
+        f'Evicting {len(evicted)} of {len(package_sizes)} packages to fit '
+        f'{report.total.bytes} bytes into {max_size} bytes')
+    evicted_plan = PathPlan()
+    for path, group in path_plan.items():
+        if group[1] in evicted:
+            evicted_plan.add(path, group)
+    return evicted_plan
@@ -2,18 +2,32 @@
 # Copyright 2021 Ruffin White
 # Licensed under the Apache License, Version 2.0
 
+import copy
+import glob
+import os
 from pathlib import Path
 
 from colcon_clean.base_handler \
     import add_base_handler_arguments, get_base_handler_extensions
+from colcon_clean.clean.event import EventPublisher
+from colcon_clean.clean.pipeline import ScanPipeline
+from colcon_clean.clean.plan import PathPlan
+from colcon_clean.clean.profiling import PhaseProfiler
+from colcon_clean.clean.trie import AncestorMap
 from colcon_clean.subverb import (
     add_clean_subverb_arguments,
     clean_paths,
+    clean_paths_pipelined,
+    clean_saved_plan,
     CleanSubverbExtensionPoint,
+    get_clean_journal,
     get_recursion_filter,
+    resume_clean_paths,
+    save_clean_plan,
     scan_directory,
 )
 from colcon_core.event_handler import add_event_handler_arguments
+from colcon_core.event_reactor import create_event_reactor
 from colcon_core.plugin_system import satisfies_version
 from colcon_core.verb import check_and_mark_build_tool
 from colcon_core.verb import logger
@@ -29,33 +43,262 @@ class WorkspaceCleanSubverb(CleanSubverbExtensionPoint):
 
     def add_arguments(self, *, parser):  # noqa: D102
         add_clean_subverb_arguments(parser)
+        parser.add_argument(
+            '--clean-pipeline',
+            action='store_true',
+            help='Scan bases concurrently and clean paths as they are '
+                 'found, only previewing the first paths before prompting')
+        parser.add_argument(
+            '--workspaces',
+            nargs='+',
+            default=None,
+            metavar='PATH',
+            help='Clean the bases of the given workspace roots or glob '
+                 'patterns of them instead of the current workspace, '
+                 'using one shared pool for scanning and deleting')
         add_base_handler_arguments(parser)
         add_event_handler_arguments(parser)
 
     def main(self, *, context):  # noqa: D102
-        check_and_mark_build_tool(context.args.build_base)
+        args = context.args
+        if not args.workspaces:
+            # the build bases of other workspaces are checked when found
+            check_and_mark_build_tool(args.build_base)
 
-        base_handler_extensions = get_base_handler_extensions()
-        base_paths = set()
+        with PhaseProfiler(args.clean_profile) as profiler, \
+                create_event_reactor(context) as event_reactor:
+            event_publisher = EventPublisher(
+                event_reactor.get_queue(), args)
+            with profiler.phase('extensions'):
+                base_handler_extensions = get_base_handler_extensions()
+                recursion_filter = get_recursion_filter(args)
 
-        args = context.args
-        recursion_filter = get_recursion_filter(args)
-
-        for base_name in args.base_select:
-            if base_name in args.base_ignore:
-                logger.info(
-                    f"Ignoring base handler for selection '{base_name}'")
-                continue
-            base_handler_extension = base_handler_extensions[base_name]
-            workspace_paths = \
-                base_handler_extension.get_workspace_paths(args=args)
-            for workspace_path in workspace_paths:
-                workspace_path = Path(workspace_path).absolute()
-                base_paths.update(
-                    scan_directory(workspace_path, recursion_filter))
-
-        clean_paths(
-            paths=base_paths,
-            confirmed=args.yes)
+            journal = get_clean_journal(args, args.workspaces)
+            if args.resume:
+                return resume_clean_paths(
+                    args, journal, event_publisher=event_publisher,
+                    profiler=profiler)
+            if args.plan_in:
+                return clean_saved_plan(
+                    args, journal, event_publisher=event_publisher,
+                    profiler=profiler)
+
+            roots = None
+            if args.workspaces:
+                roots = get_workspace_roots(args.workspaces)
+            workspace_paths = get_workspace_base_paths(
+                args, base_handler_extensions, roots)
+            results = None
+            if roots:
+                results = WorkspaceResults(roots)
+
+            if args.clean_pipeline:
+                if (
+                    args.dry_run or args.report or args.report_file or
+                    args.clean_instant or args.plan_out
+                ):
+                    logger.warning(
+                        'Ignoring --clean-pipeline since it requires all '
+                        'paths to be scanned before cleaning')
+                else:
+                    clean_paths_pipelined(
+                        directories=list(workspace_paths.keys()),
+                        recursion_filter=recursion_filter,
+                        confirmed=args.yes,
+                        workers=args.clean_workers,
+                        use_index=args.clean_index,
+                        event_publisher=event_publisher,
+                        profiler=profiler,
+                        observers=[results] if results else None,
+                        groups=workspace_paths)
+                    if results:
+                        results.print_results()
+                    return 0
+
+            with profiler.phase('scan') as phase:
+                if roots:
+                    path_plan = scan_workspaces(
+                        workspace_paths, recursion_filter,
+                        use_index=args.clean_index,
+                        workers=args.clean_workers)
+                else:
+                    path_plan = PathPlan()
+                    for workspace_path, group in workspace_paths.items():
+                        for path in scan_directory(
+                            workspace_path, recursion_filter,
+                            use_index=args.clean_index,
+                            event_publisher=event_publisher,
+                            group=group,
+                        ):
+                            path_plan.add(path, group)
+                phase.paths = len(path_plan)
+
+            if args.plan_out:
+                save_clean_plan(args, path_plan, profiler=profiler)
+                return 0
+
+            clean_paths(
+                paths=path_plan,
+                confirmed=args.yes,
+                workers=args.clean_workers,
+                instant=args.clean_instant,
+                dry_run=args.dry_run,
+                report=args.report,
+                report_file=args.report_file,
+                groups=path_plan,
+                event_publisher=event_publisher,
+                profiler=profiler,
+                verbose=args.clean_verbose,
+                network_workers=args.clean_network_workers,
+                journal=journal,
+                observers=[results] if results else None,
+                base_paths=list(workspace_paths.keys()))
+            if results:
+                results.print_results()
 
         return 0
+
+
+def get_workspace_roots(patterns):
+    """
+    Get the workspace roots matching paths or glob patterns.
+
+    :param patterns: The paths or glob patterns of the workspace roots
+    :returns: The absolute paths of the existing workspace roots without
+      duplicates
+    :rtype: list
+    """
+    roots = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(os.path.expanduser(pattern)))
+        if not matches:
+            logger.warning(f"Skipping missing workspace '{pattern}'")
+        for match in matches:
+            root = Path(match).absolute()
+            if root.is_dir() and root not in roots:
+                roots.append(root)
+    return roots
+
+
+def get_workspace_args(args, root):
+    """
+    Get the command line arguments for another workspace root.
+
+    Relative paths of the arguments of the bases, e.g. `--build-base`, are
+    relative to the current working directory, so they are joined to the
+    workspace root instead.
+
+    :param args: The parsed command line arguments
+    :param root: The workspace root
+    :rtype: argparse.Namespace
+    """
+    workspace_args = copy.copy(args)
+    for key, value in vars(args).items():
+        if (
+            key.endswith('_base') and isinstance(value, str) and
+            not os.path.isabs(value)
+        ):
+            setattr(workspace_args, key, os.path.join(str(root), value))
+    return workspace_args
+
+
+def get_workspace_base_paths(args, base_handler_extensions, roots=None):
+    """
+    Get the base paths of the selected bases of the workspaces.
+
+    The build base of each additional workspace is checked for the marker
+    of the build tool like the one of the current workspace, but only if it
+    exists.
+
+    :param args: The parsed command line arguments
+    :param base_handler_extensions: The base handler extensions by name
+    :param roots: The workspace roots or `None` for the current workspace
+    :returns: The mapping of absolute base paths to `(base_name, None)`
+      tuples, where the first base of a path takes precedence
+    :rtype: dict
+    """
+    workspace_args = [args]
+    if roots is not None:
+        workspace_args = [get_workspace_args(args, root) for root in roots]
+        for root_args in workspace_args:
+            if os.path.isdir(root_args.build_base):
+                check_and_mark_build_tool(root_args.build_base)
+    workspace_paths = {}
+    for base_name in args.base_select:
+        if base_name in args.base_ignore:
+            logger.info(
+                f"Ignoring base handler for selection '{base_name}'")
+            continue
+        base_handler_extension = base_handler_extensions[base_name]
+        for root_args in workspace_args:
+            for workspace_path in \
+                    base_handler_extension.get_workspace_paths(args=root_args):
+                workspace_paths.setdefault(
+                    Path(workspace_path).absolute(), (base_name, None))
+    return workspace_paths
+
+
+def scan_workspaces(
+    workspace_paths, recursion_filter, use_index=False, workers=None,
+):
+    """
+    Scan the base paths of many workspaces concurrently.
+
+    :param workspace_paths: The mapping of base paths to
+      `(base_name, None)` tuples
+    :param recursion_filter: The clean filter or `None`
+    :param use_index: Flag if the scan index should be used
+    :param workers: The number of concurrent scans, `None` to use the number
+      of CPUs
+    :returns: The found paths and their groups
+    :rtype: PathPlan
+    """
+    path_plan = PathPlan()
+    groups = AncestorMap(workspace_paths)
+    pipeline = ScanPipeline(
+        list(workspace_paths.keys()),
+        lambda directory, cancelled: scan_directory(
+            directory, recursion_filter, use_index=use_index,
+            cancelled=cancelled),
+        workers=workers)
+    try:
+        for path in pipeline:
+            path_plan.add(path, groups.get(path))
+    finally:
+        pipeline.cancel()
+        pipeline.close()
+    return path_plan
+
+
+class WorkspaceResults:
+    """The number of cleaned paths and errors of each workspace."""
+
+    def __init__(self, roots):  # noqa: D107
+        self._results = {root: [0, 0] for root in roots}
+        self._roots = AncestorMap({root: root for root in roots})
+
+    def add(self, path, errors):
+        """
+        Record the outcome of cleaning a path.
+
+        :param path: The path which was cleaned
+        :param errors: The list of `(path, exception)` tuples collected while
+          cleaning the path
+        """
+        root = self._roots.get(path)
+        if root is None:
+            return
+        result = self._results[root]
+        if errors:
+            result[1] += len(errors)
+        else:
+            result[0] += 1
+
+    def print_results(self):
+        """Print the results of each workspace."""
+        print('Workspaces:')
+        for root, (cleaned, errors) in self._results.items():
+            message = f"    '{root}': cleaned {cleaned} paths"
+            if errors:
+                message += f' with {errors} errors'
+            print(message)
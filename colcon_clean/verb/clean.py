@@ -2,7 +2,6 @@
 # Copyright 2021 Ruffin White
 # Licensed under the Apache License, Version 2.0
 
-from colcon_clean.subverb import get_subverb_extensions
 from colcon_core.command import add_subparsers
 from colcon_core.plugin_system import satisfies_version
 from colcon_core.verb import VerbExtensionPoint
@@ -20,6 +19,11 @@ class CleanVerb(VerbExtensionPoint):
         # remember the subparser to print usage in case no subverb is passed
         self._subparser = parser
 
+        # colcon imports all verbs on every invocation but only adds the
+        # arguments of the invoked verb, so the subverb extensions are only
+        # imported here
+        from colcon_clean.subverb import get_subverb_extensions
+
         # get subverb extensions and let them add their arguments
         subverb_extensions = get_subverb_extensions()
         add_subparsers(
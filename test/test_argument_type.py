@@ -0,0 +1,34 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import argparse
+import datetime
+
+from colcon_clean.clean.argument_type import duration
+from colcon_clean.clean.argument_type import positive_int
+from colcon_clean.clean.argument_type import size
+import pytest
+
+
+def test_duration():
+    assert duration('7d') == datetime.timedelta(days=7)
+    assert duration('90m') == datetime.timedelta(minutes=90)
+    with pytest.raises(argparse.ArgumentTypeError):
+        duration('7 days')
+
+
+def test_positive_int():
+    assert positive_int('3') == 3
+    with pytest.raises(argparse.ArgumentTypeError):
+        positive_int('0')
+    with pytest.raises(argparse.ArgumentTypeError):
+        positive_int('foo')
+
+
+def test_size():
+    assert size('1024') == 1024
+    assert size('512M') == 512 * 1024 ** 2
+    assert size('1.5g') == 3 * 1024 ** 3 // 2
+    assert size('50GiB') == 50 * 1024 ** 3
+    with pytest.raises(argparse.ArgumentTypeError):
+        size('50 gigabytes')
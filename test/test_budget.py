@@ -0,0 +1,33 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from colcon_clean.clean.budget import BUILD_MARKER
+from colcon_clean.clean.budget import get_last_build_time
+from colcon_clean.clean.budget import select_packages_to_evict
+
+
+def test_get_last_build_time():
+    with TemporaryDirectory(prefix='test_colcon_') as build_base:
+        (Path(build_base) / 'pkg').mkdir()
+        (Path(build_base) / 'pkg' / BUILD_MARKER).touch()
+        os.utime(Path(build_base) / 'pkg' / BUILD_MARKER, (42, 42))
+        assert get_last_build_time(build_base, 'pkg') == 42
+        assert get_last_build_time(build_base, 'missing') is None
+
+
+def test_select_packages_to_evict():
+    package_sizes = {'hot': 30, 'warm': 30, 'cold': 30, 'unbuilt': 10}
+    last_build_times = {'hot': 3, 'warm': 2, 'cold': 1, 'unbuilt': None}
+    assert select_packages_to_evict(
+        package_sizes, last_build_times, 100) == []
+    assert select_packages_to_evict(
+        package_sizes, last_build_times, 90) == ['unbuilt']
+    assert select_packages_to_evict(
+        package_sizes, last_build_times, 50) == ['unbuilt', 'cold', 'warm']
+    assert select_packages_to_evict(
+        package_sizes, last_build_times, 0) == [
+            'unbuilt', 'cold', 'warm', 'hot']
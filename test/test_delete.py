@@ -0,0 +1,79 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from colcon_clean.clean import delete
+from colcon_clean.clean.delete import delete_paths
+
+
+def test_delete_paths():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        (base / 'dir' / 'sub').mkdir(parents=True)
+        (base / 'dir' / 'sub' / 'file.txt').write_text('content')
+        (base / 'file.txt').write_text('content')
+        (base / 'keep.txt').write_text('content')
+        (base / 'link').symlink_to(base / 'dir')
+
+        paths = [
+            base / 'dir',
+            base / 'file.txt',
+            base / 'link',
+            base / 'missing',
+            base / 'keep.txt' / 'not_a_child',
+        ]
+        summary = delete_paths(paths, workers=2)
+
+        assert not (base / 'dir').exists()
+        assert not (base / 'file.txt').exists()
+        assert not (base / 'link').is_symlink()
+        assert (base / 'keep.txt').exists()
+        assert summary.cleaned == 4
+        assert len(summary.errors) == 1
+        assert summary.errors[0][0] == base / 'keep.txt' / 'not_a_child'
+
+
+def test_delete_paths_nested():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        (base / 'dir' / 'a' / 'b' / 'c').mkdir(parents=True)
+        (base / 'dir' / 'a' / 'b' / 'c' / 'file.txt').write_text('content')
+        (base / 'dir' / 'a' / 'file.txt').write_text('content')
+        (base / 'dir' / 'a' / 'link').symlink_to(base / 'keep')
+        (base / 'keep').mkdir()
+        (base / 'keep' / 'file.txt').write_text('content')
+
+        summary = delete_paths([base / 'dir'], workers=1)
+
+        assert not (base / 'dir').exists()
+        assert (base / 'keep' / 'file.txt').exists()
+        assert summary.cleaned == 1
+        assert summary.errors == []
+
+
+def test_delete_paths_split(monkeypatch):
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        for pkg_name in ('pkg_a', 'pkg_b'):
+            (base / 'build' / pkg_name / 'sub').mkdir(parents=True)
+            (base / 'build' / pkg_name / 'sub' / 'file.txt').write_text('x')
+        (base / 'build' / 'file.txt').write_text('x')
+
+        delete_tree = delete._delete_tree
+        deleted = []
+
+        def record(path):
+            deleted.append(Path(path))
+            return delete_tree(path)
+
+        monkeypatch.setattr(delete, '_delete_tree', record)
+        summary = delete_paths([base / 'build'], workers=2)
+
+        # the packages of the base are deleted as separate tasks
+        assert sorted(deleted) == [
+            base / 'build' / 'pkg_a', base / 'build' / 'pkg_b']
+        assert summary.cleaned == 1
+        assert summary.errors == []
+        assert not (base / 'build').exists()
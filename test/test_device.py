@@ -0,0 +1,121 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import threading
+
+from colcon_clean.clean import delete
+from colcon_clean.clean.device import get_device
+from colcon_clean.clean.device import get_mount_points
+from colcon_clean.clean.device import get_network_devices
+import pytest
+
+MOUNTINFO = """\
+22 1 259:2 / / rw,relatime shared:1 - ext4 /dev/nvme0n1p2 rw
+36 22 0:53 / /ws/install rw,relatime shared:20 - nfs4 server:/install rw
+37 22 0:54 / /ws/log rw,relatime - fuse.sshfs host:/log rw
+38 22 0:55 / /tmp rw,nosuid - tmpfs tmpfs rw
+39 22 0:56 / /ws/with\\040space rw - ext4 /dev/sdb1 rw
+"""
+
+
+def test_get_network_devices():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        path = Path(base) / 'mountinfo'
+        path.write_text(MOUNTINFO)
+        assert get_network_devices(str(path)) == {
+            os.makedev(0, 53), os.makedev(0, 54)}
+        assert get_network_devices(str(Path(base) / 'missing')) == set()
+
+
+def test_get_mount_points():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        path = Path(base) / 'mountinfo'
+        path.write_text(MOUNTINFO)
+        assert get_mount_points(str(path)) == {
+            '/', '/ws/install', '/ws/log', '/tmp', '/ws/with space'}
+        assert get_mount_points(str(Path(base) / 'missing')) == set()
+
+
+def test_get_device():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        (base / 'a').write_text('content')
+        assert get_device(base / 'a') == os.lstat(base).st_dev
+        assert get_device(base / 'missing') is None
+
+
+def test_delete_paths_per_device(monkeypatch):
+    monkeypatch.setattr(delete, 'get_device', lambda path: path.name[0])
+    monkeypatch.setattr(delete, 'get_network_devices', lambda: {'n'})
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        paths = []
+        for name in ('local', 'network'):
+            for index in range(20):
+                path = base / f'{name}_{index}'
+                (path / 'sub').mkdir(parents=True)
+                paths.append(path)
+        # each path is a mount point of its own device
+        monkeypatch.setattr(
+            delete, 'get_mount_points', lambda: {str(path) for path in paths})
+        summary = delete.delete_paths(paths, workers=1)
+        assert summary.cleaned == len(paths)
+        assert not summary.errors
+        assert not any(path.exists() for path in paths)
+
+
+def test_delete_paths_interrupted(monkeypatch):
+    def get_device(path):
+        if path.name == 'network_10':
+            raise KeyboardInterrupt()
+        return path.name[0]
+
+    monkeypatch.setattr(delete, 'get_device', get_device)
+    monkeypatch.setattr(delete, 'get_network_devices', lambda: {'n'})
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        paths = []
+        for name in ('local', 'network'):
+            for index in range(20):
+                path = base / f'{name}_{index:02}'
+                path.mkdir()
+                paths.append(path)
+        monkeypatch.setattr(
+            delete, 'get_mount_points', lambda: {str(path) for path in paths})
+        threads = threading.active_count()
+        with pytest.raises(KeyboardInterrupt):
+            delete.delete_paths(paths, workers=1)
+        assert threading.active_count() == threads
+        assert not paths[0].exists()
+        assert paths[-1].exists()
+
+
+def test_delete_paths_device_per_directory(monkeypatch):
+    devices_looked_up = []
+
+    def get_device(path):
+        devices_looked_up.append(path.name)
+        return path.name[0]
+
+    monkeypatch.setattr(delete, 'get_device', get_device)
+    monkeypatch.setattr(delete, 'get_network_devices', lambda: {'n'})
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        paths = []
+        for name in ('local', 'network'):
+            for index in range(20):
+                path = base / name / f'{index}.o'
+                path.parent.mkdir(exist_ok=True)
+                path.write_text('content')
+                paths.append(path)
+        (base / 'mount' / 'sub').mkdir(parents=True)
+        paths.append(base / 'mount')
+        monkeypatch.setattr(
+            delete, 'get_mount_points', lambda: {str(base / 'mount')})
+        summary = delete.delete_paths(sorted(paths), workers=1)
+        assert summary.cleaned == len(paths)
+        assert not any(path.exists() for path in paths)
+    assert sorted(devices_looked_up) == ['local', 'mount', 'network']
@@ -0,0 +1,131 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+from pathlib import Path
+from queue import Queue
+from tempfile import TemporaryDirectory
+
+from colcon_clean.clean.delete import delete_paths
+from colcon_clean.clean.event import CleanEnded
+from colcon_clean.clean.event import CleanScanned
+from colcon_clean.clean.event import EventPublisher
+from colcon_clean.clean.event import EventSummary
+from colcon_clean.clean.event import get_job_identifiers
+from colcon_clean.clean.report import get_usage_report
+from colcon_clean.subverb import clean_paths_pipelined
+from colcon_clean.subverb import scan_directory
+from colcon_core.event.job import JobEnded
+from colcon_core.event.job import JobStarted
+
+
+def _get_events(event_queue):
+    events = []
+    while not event_queue.empty():
+        event, job = event_queue.get()
+        assert job.identifier == event.identifier
+        events.append(event)
+    return events
+
+
+def test_get_job_identifiers():
+    assert get_job_identifiers(None) == ('clean', )
+    assert get_job_identifiers(('build', None)) == ('build', )
+    assert get_job_identifiers(('build', 'pkg')) == ('build', 'build/pkg')
+
+
+def test_event_summary():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        groups = {}
+        for pkg_name in ('pkg_a', 'pkg_b'):
+            path = base / pkg_name
+            (path / 'sub').mkdir(parents=True)
+            (path / 'sub' / 'file').write_text('content')
+            groups[path] = ('build', pkg_name)
+        usage_report = get_usage_report(groups.keys(), groups=groups)
+
+        event_queue = Queue()
+        summary = EventSummary(
+            EventPublisher(event_queue), groups.keys(), groups=groups,
+            usage_report=usage_report)
+        delete_paths(groups.keys(), workers=1, summary=summary)
+        assert summary.cleaned == 2
+        assert not any(path.exists() for path in groups.keys())
+
+    events = _get_events(event_queue)
+    jobs = [
+        (type(event), event.identifier) for event in events
+        if not isinstance(event, CleanEnded)]
+    assert len(jobs) == 6
+    assert jobs[0] == (JobStarted, 'build')
+    assert jobs[-1] == (JobEnded, 'build')
+    for identifier in ('build/pkg_a', 'build/pkg_b'):
+        assert jobs.index((JobStarted, identifier)) < \
+            jobs.index((JobEnded, identifier))
+    ended = {
+        event.identifier: event for event in events
+        if isinstance(event, CleanEnded)}
+    assert ended['build'].paths == 2
+    assert ended['build'].files == 2
+    assert ended['build/pkg_a'].paths == 1
+    assert ended['build/pkg_a'].size > 0
+    assert not ended['build'].errors
+    assert all(event.rc == 0 for event in events
+               if isinstance(event, JobEnded))
+
+
+def test_event_summary_unknown_paths():
+    event_queue = Queue()
+    summary = EventSummary(EventPublisher(event_queue))
+    summary.start(Path('a'))
+    summary.add(Path('a'), [])
+    summary.start(Path('b'))
+    summary.add(Path('b'), [(Path('b'), OSError('failure'))])
+    assert not any(
+        isinstance(event, JobEnded) for event in _get_events(event_queue))
+
+    summary.finish()
+    events = _get_events(event_queue)
+    assert isinstance(events[0], CleanEnded)
+    assert events[0].identifier == 'clean'
+    assert events[0].paths == 2
+    assert events[0].files is None
+    assert len(events[0].errors) == 1
+    assert isinstance(events[1], JobEnded)
+    assert events[1].rc == 1
+
+
+def test_scan_directory_event():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        event_queue = Queue()
+        paths = list(scan_directory(
+            base, None, event_publisher=EventPublisher(event_queue),
+            group=('log', None)))
+        assert paths == [base]
+
+    events = _get_events(event_queue)
+    assert len(events) == 1
+    assert isinstance(events[0], CleanScanned)
+    assert events[0].identifier == 'log'
+    assert events[0].paths == 1
+
+
+def test_clean_paths_pipelined_events():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        groups = {}
+        for pkg_name in ('pkg_a', 'pkg_b'):
+            path = base / 'build' / pkg_name
+            (path / 'sub').mkdir(parents=True)
+            groups[path] = ('build', pkg_name)
+        event_queue = Queue()
+        clean_paths_pipelined(
+            list(groups.keys()), None, confirmed=True, workers=1,
+            event_publisher=EventPublisher(event_queue), groups=groups)
+        assert not any(path.exists() for path in groups)
+
+    identifiers = {
+        event.identifier for event in _get_events(event_queue)
+        if isinstance(event, CleanEnded)}
+    assert identifiers == {'build', 'build/pkg_a', 'build/pkg_b'}
@@ -0,0 +1,91 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+from argparse import Namespace
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from colcon_clean.clean.journal import CleanJournal
+from colcon_clean.clean.journal import JOURNAL_FILENAME
+from colcon_clean.subverb import get_clean_journal
+from colcon_clean.subverb import resume_clean_paths
+
+
+def test_clean_journal():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        journal = CleanJournal(base / 'log' / 'journal')
+        assert not journal.exists()
+        paths = [base / 'build' / f'pkg_{index}' for index in range(4)]
+        groups = {path: ('build', path.name) for path in paths}
+        assert journal.start(paths, groups=groups)
+        journal.complete(paths[0])
+        journal.close(finished=False)
+
+        # a record cut off by an interruption is ignored
+        with journal.path.open('ab') as h:
+            h.write(('["-", "' + str(paths[1]) + '\u00e4"]').encode()[:-3])
+        assert journal.exists()
+        plan = journal.load()
+        assert list(plan) == paths[1:]
+        assert plan.get(paths[1]) == ('build', 'pkg_1')
+
+        # and removed before further records are appended
+        assert journal.start()
+        journal.complete(paths[1])
+        journal.close(finished=False)
+        assert list(journal.load()) == paths[2:]
+
+        journal.start()
+        journal.close(finished=True)
+        assert not journal.exists()
+
+        # a journal cut off within its header has no paths
+        journal.path.write_text('["colcon-clean-jour')
+        assert list(journal.load()) == []
+
+
+def test_resume_clean_paths(monkeypatch):
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        monkeypatch.chdir(base)
+        args = Namespace(
+            build_base='build', log_base=str(base / 'log'), yes=True,
+            clean_workers=1, clean_instant=False, dry_run=False, report=None,
+            report_file=None, clean_verbose=False, clean_network_workers=None)
+        journal = get_clean_journal(args)
+        assert journal.path.parent == base
+        assert get_clean_journal(args, ['ws_*']).path != journal.path
+        assert resume_clean_paths(args, journal) == 0
+
+        journal.path.write_text('["colcon-clean-plan", 1]\n')
+        assert resume_clean_paths(args, journal) == 1
+        journal.path.unlink()
+
+        paths = []
+        for index in range(4):
+            path = base / 'build' / f'pkg_{index}'
+            (path / 'sub').mkdir(parents=True)
+            paths.append(path)
+        journal.start(paths)
+        journal.complete(paths[0])
+        journal.close(finished=False)
+
+        assert resume_clean_paths(args, journal) == 0
+        assert paths[0].exists()
+        assert not any(path.exists() for path in paths[1:])
+        assert not journal.exists()
+
+
+def test_get_clean_journal():
+    args = Namespace(build_base=str(Path('/ws_a', 'build')))
+    journal = get_clean_journal(args)
+    assert journal.path == Path('/ws_a', JOURNAL_FILENAME)
+
+    journal_a = get_clean_journal(args, ['/other/ws_a*'])
+    journal_b = get_clean_journal(args, ['/other/ws_b*'])
+    assert journal_a.path.parent == Path('/ws_a')
+    assert journal_a.path != journal.path
+    assert journal_a.path != journal_b.path
+    assert journal_a.path == \
+        get_clean_journal(args, ['/other/ws_a*', '/other/ws_a*']).path
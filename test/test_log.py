@@ -0,0 +1,51 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from colcon_clean.base_handler.log import get_expired_run_paths
+from colcon_clean.base_handler.log import RUN_TIMESTAMP_FORMAT
+
+
+def test_get_expired_run_paths():
+    with TemporaryDirectory(prefix='test_colcon_') as log_base:
+        log_base = Path(log_base)
+        now = datetime.datetime.now()
+        names = []
+        for days in (0, 1, 2, 10, 20):
+            timestamp = now - datetime.timedelta(days=days, minutes=1)
+            name = f'build_{timestamp.strftime(RUN_TIMESTAMP_FORMAT)}'
+            (log_base / name).mkdir()
+            names.append(name)
+        (log_base / 'latest').symlink_to(log_base / names[0])
+        (log_base / 'COLCON_IGNORE').touch()
+        (log_base / 'test_2000-13-01_00-00-00').mkdir()
+
+        def expired(**kwargs):
+            return [
+                Path(path).name
+                for path in get_expired_run_paths(str(log_base), **kwargs)]
+
+        assert expired(keep_last=2) == names[2:]
+        assert expired(older_than=datetime.timedelta(days=7)) == names[3:]
+        assert expired(
+            keep_last=4, older_than=datetime.timedelta(days=7)) == names[4:]
+        assert get_expired_run_paths(
+            str(log_base / 'missing'), keep_last=1) == []
+
+
+def test_get_expired_run_paths_same_second():
+    with TemporaryDirectory(prefix='test_colcon_') as log_base:
+        log_base = Path(log_base)
+        timestamp = datetime.datetime.now().strftime(RUN_TIMESTAMP_FORMAT)
+        names = [
+            f'clean_{timestamp}_10', f'clean_{timestamp}_2',
+            f'clean_{timestamp}']
+        for name in names:
+            (log_base / name).mkdir()
+        assert [
+            Path(path).name
+            for path in get_expired_run_paths(str(log_base), keep_last=1)
+        ] == names[1:]
@@ -37,6 +37,68 @@ def test_main(monkeypatch):
         main(argv=argv + ['build'])
         main(argv=argv + ['test'])
 
+        # Report what would be cleaned without cleaning anything
+        main(argv=argv + ['clean', 'workspace', '--dry-run'])
+        main(argv=argv + ['clean', 'packages', '--dry-run', \
+            '--report', 'json', \
+            '--report-file', str(ws_base / 'report.json'), \
+            '--clean-profile', 'trace', \
+            '--clean-match', \
+                '*.py'])  # noqa
+
+        # Assert the report is written to the report file
+        assert (ws_base / 'report.json').exists()
+
+        # Assert the profile is written to the log directory
+        assert list((ws_base / 'log').glob('clean_*/clean_trace.json'))
+
+        # Assert nothing is cleaned
+        assert (ws_base / 'build' / 'test-package-a').exists()
+        assert (ws_base / 'install' / 'test-package-a').exists()
+
+        # Clean all but the last log directories
+        main(argv=argv + ['clean', 'workspace', '--yes', \
+            '--base-select', \
+                'log', \
+            '--log-keep-last', '1'])  # noqa
+
+        # Assert the log base and the latest logs are kept
+        assert (ws_base / 'log' / 'latest').exists()
+
+        # Clean the least recently built packages to fit a budget
+        main(argv=argv + ['clean', 'packages', '--yes', \
+            '--max-size', '1T'])  # noqa
+
+        # Assert nothing is cleaned when the budget is met
+        assert (ws_base / 'build' / 'test-package-a').exists()
+
+        # Clean paths of packages no longer in the workspace
+        (ws_base / 'build' / 'test-package-z').mkdir()
+        (ws_base / 'install' / 'test-package-z').mkdir()
+        main(argv=argv + ['clean', 'orphans', '--yes'])  # noqa
+
+        # Assert only orphaned package paths are cleaned
+        assert not (ws_base / 'build' / 'test-package-z').exists()
+        assert not (ws_base / 'install' / 'test-package-z').exists()
+        assert (ws_base / 'build' / 'test-package-a').exists()
+        assert (ws_base / 'install' / 'test-package-a').exists()
+        assert (ws_base / 'log').exists()
+
+        # Clean package paths while they are being scanned
+        main(argv=argv + ['clean', 'packages', '--yes', \
+            '--clean-pipeline', \
+            '--clean-match', \
+                '*.py', \
+            '--packages-select', \
+                'test-package-a'])  # noqa
+
+        # Assert only matches of the selected packages are cleaned
+        assert not (ws_base / 'build' / 'test-package-a' / 'build' / 'lib' /
+                    'test_package_a' / '__init__.py').exists()
+        assert (ws_base / 'build' / 'test-package-a' /
+                'colcon_build.rc').exists()
+        assert (ws_base / 'install' / 'test-package-b').exists()
+
         # Clean all package base paths explicitly
         main(argv=argv + ['clean', 'packages', '--yes', \
             '--base-select', \
@@ -81,6 +143,19 @@ def test_main(monkeypatch):
         assert (ws_base / 'build' / 'test-package-a' /
                 'colcon_build.rc').exists()
 
+        # Clean workspace build base paths of old or large files only
+        main(argv=argv + ['clean', 'workspace', '--yes', \
+            '--base-select', \
+                'build', \
+            '--clean-older-than', \
+                '14d', \
+            '--clean-larger-than', \
+                '100M'])  # noqa
+
+        # Assert recently built files are not cleaned
+        assert (ws_base / 'build' / 'test-package-a' /
+                'colcon_build.rc').exists()
+
         # Try again but with nothing left to clean
         main(argv=argv + ['clean', 'workspace', '--yes', \
             '--base-select', \
@@ -89,6 +164,53 @@ def test_main(monkeypatch):
                 '*.py', \
                 '*.py'])  # noqa
 
+        # Clean workspace build base paths while scanning them
+        main(argv=argv + ['clean', 'workspace', '--yes', \
+            '--clean-pipeline', \
+            '--base-select', \
+                'build', \
+            '--clean-match', \
+                'colcon_build.rc'])  # noqa
+
+        # Assert workspace matches are cleaned
+        assert not (ws_base / 'build' / 'test-package-a' /
+                    'colcon_build.rc').exists()
+
+        # Plan cleaning the workspace install base paths
+        plan_path = ws_base / 'plan.bin'
+        main(argv=argv + ['clean', 'workspace', \
+            '--base-select', \
+                'install', \
+            '--plan-out', \
+                str(plan_path)])  # noqa
+
+        # Assert planned paths are not cleaned yet
+        assert (ws_base / 'install').exists()
+
+        # Clean the planned paths without scanning
+        main(argv=argv + ['clean', 'workspace', '--yes', \
+            '--plan-in', \
+                str(plan_path)])  # noqa
+
+        # Assert planned paths are cleaned
+        assert not (ws_base / 'install').exists()
+
+        # Clean the base paths of other workspaces
+        for name in ('other_ws_a', 'other_ws_b'):
+            (ws_base / name / 'build' / 'pkg').mkdir(parents=True)
+            (ws_base / name / 'install' / 'pkg').mkdir(parents=True)
+        main(argv=argv + ['clean', 'workspace', '--yes', \
+            '--base-select', \
+                'build', \
+                'install', \
+            '--workspaces', \
+                str(ws_base / 'other_ws_*')])  # noqa
+
+        # Assert only the base paths of the other workspaces are cleaned
+        assert not (ws_base / 'other_ws_a' / 'build').exists()
+        assert not (ws_base / 'other_ws_b' / 'install').exists()
+        assert (ws_base / 'build').exists()
+
         # Clean all workspace base paths explicitly
         main(argv=argv + ['clean', 'workspace', '--yes', \
             '--base-select', \
@@ -107,6 +229,12 @@ def test_main(monkeypatch):
         # Try again implicitly but with nothing left to clean
         main(argv=argv + ['clean', 'workspace', '--yes'])  # noqa
 
+        # Assert the journal of finished cleans is removed
+        assert not (ws_base / '.colcon_clean_journal.jsonl').exists()
+
+        # Try to resume without an interrupted clean
+        main(argv=argv + ['clean', 'workspace', '--yes', '--resume'])  # noqa
+
         main(argv=argv + ['build'])
         main(argv=argv + ['test'])
 
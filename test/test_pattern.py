@@ -0,0 +1,39 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+from colcon_clean.clean.pattern import PatternMatcher
+from pathspec import PathSpec
+import pytest
+
+PATHS = [
+    'a.py', 'pkg/a.py', 'pkg/a.py/b.o', 'foo', 'pkg/foo', 'pkg/foo/a.c',
+    'pkg/foo/', '.git/config', 'pkg/.hidden', 'pkg/sub/a.txt',
+    'pkg/CMakeFiles/x.o', 'pkg_a/keep/a.o', 'a.tar.gz', '!x',
+]
+
+
+@pytest.mark.parametrize('patterns', [
+    ['*.py'],
+    ['*.o', '*.py', '!pkg/*.py'],
+    ['foo', '!foo/'],
+    ['foo/', 'CMakeFiles/', '*.gz'],
+    ['*', '!.*', '!.*/', '!*.txt'],
+    ['*', '!/pkg_a/keep/', '[ab].py', '\\!x'],
+    ['**/CMakeFiles/', '!*.py', '*.o ', '#comment', ''],
+])
+def test_pattern_matcher(patterns):
+    path_spec = PathSpec.from_lines(
+        'gitwildmatch', [pattern for pattern in patterns if pattern])
+    matcher = PatternMatcher(patterns)
+    for path in PATHS:
+        assert matcher.match_file(path) == path_spec.match_file(path), path
+
+
+def test_pattern_matcher_match_dir():
+    matcher = PatternMatcher(['*', '!/pkg_a/keep/'])
+    assert matcher.match_dir('pkg_b')
+    assert not matcher.match_dir('pkg_a')
+    assert not matcher.match_dir('pkg_a/keep')
+
+    matcher = PatternMatcher(['*/CMakeFiles/', '!*.txt'])
+    assert not matcher.match_dir('pkg/CMakeFiles')
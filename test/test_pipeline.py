@@ -0,0 +1,72 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import time
+
+from colcon_clean.clean.pipeline import ScanPipeline
+
+
+def _scan(directory, cancelled):
+    for index in range(int(directory.split('/')[-1])):
+        yield f'{directory}/{index}'
+
+
+def test_scan_pipeline():
+    pipeline = ScanPipeline(
+        ['ws/3', 'ws/50', 'ws/0', 'ws/3'], _scan, workers=2)
+    try:
+        preview, complete = pipeline.peek(5)
+        assert len(preview) == 5
+        assert not complete
+        paths = list(pipeline)
+    finally:
+        pipeline.cancel()
+        pipeline.close()
+    assert paths[:5] == preview
+    assert len(paths) == 3 + 50
+    assert len(set(paths)) == len(paths)
+
+    pipeline = ScanPipeline(['ws/2'], _scan, workers=1)
+    preview, complete = pipeline.peek(5)
+    pipeline.close()
+    assert sorted(preview) == ['ws/2/0', 'ws/2/1']
+    assert complete
+
+    # paths below a path found in an enclosing directory are skipped
+    pipeline = ScanPipeline(['ws/10', 'ws/10/4'], _scan, workers=1)
+    paths = list(pipeline)
+    pipeline.close()
+    assert sorted(paths) == sorted(f'ws/10/{index}' for index in range(10))
+
+    pipeline = ScanPipeline([], _scan, workers=1)
+    assert list(pipeline) == []
+    pipeline.close()
+
+
+def test_scan_pipeline_cancel():
+    pipeline = ScanPipeline(['ws/100000'], _scan, workers=1)
+    assert len(pipeline.peek(1)[0]) == 1
+    pipeline.cancel()
+    pipeline.close()
+
+
+def test_scan_pipeline_cancel_without_paths():
+    started = []
+
+    def scan(directory, cancelled):
+        # e.g. a filtered scan of a large tree without any matches
+        started.append(directory)
+        while not cancelled.wait(0.01):
+            pass
+        return
+        yield
+
+    pipeline = ScanPipeline(
+        [f'ws/{index}' for index in range(10)], scan, workers=2)
+    start_time = time.monotonic()
+    while len(started) < 2 and time.monotonic() - start_time < 5:
+        time.sleep(0.01)
+    pipeline.cancel()
+    pipeline.close()
+    # the directories which haven't been started are skipped
+    assert len(started) == 2
@@ -0,0 +1,127 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+from argparse import Namespace
+import gzip
+import json
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from colcon_clean.clean.plan import PathPlan
+from colcon_clean.clean.plan import sorted_paths
+from colcon_clean.subverb import clean_saved_plan
+import pytest
+
+
+def test_path_plan():
+    plan = PathPlan()
+    assert plan.add(Path('/ws/build/pkg_b/file'), ('build', 'pkg_b'))
+    assert plan.add(Path('/ws/build/pkg_a/file'), ('build', 'pkg_a'))
+    assert plan.add(Path('/ws/build/pkg_a/other'), ('build', 'pkg_a'))
+    assert plan.add(Path('/ws/install'))
+    assert not plan.add(Path('/ws/build/pkg_a/file'), ('test_result', None))
+    assert len(plan) == 4
+
+    assert Path('/ws/build/pkg_a/file') in plan
+    assert Path('/ws/build/pkg_a') not in plan
+    assert plan.get(Path('/ws/build/pkg_a/file')) == ('build', 'pkg_a')
+    assert plan.get(Path('/ws/install'), (None, None)) == (None, None)
+    assert plan.get(Path('/ws/log')) is None
+
+    assert list(plan) == [
+        Path('/ws/install'),
+        Path('/ws/build/pkg_a/file'),
+        Path('/ws/build/pkg_a/other'),
+        Path('/ws/build/pkg_b/file'),
+    ]
+    assert sorted_paths(plan) is plan
+    assert sorted_paths({Path('b'), Path('a')}) == [Path('a'), Path('b')]
+
+
+def test_path_plan_remove_nested():
+    plan = PathPlan()
+    plan.add(Path('/ws/build/pkg/sub/file'), ('build', 'pkg'))
+    plan.add(Path('/ws/build/pkg/file'), ('build', 'pkg'))
+    plan.add(Path('/ws/build/other/file'), ('build', 'other'))
+    plan.add(Path('/ws/build/pkg'), ('test_result', 'pkg'))
+    plan.add(Path('/ws/install'), ('install', None))
+    assert plan.remove_nested() == 2
+    assert len(plan) == 3
+    assert list(plan.items()) == [
+        (Path('/ws/install'), ('install', None)),
+        (Path('/ws/build/pkg'), ('test_result', 'pkg')),
+        (Path('/ws/build/other/file'), ('build', 'other')),
+    ]
+
+
+def test_path_plan_save_load():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        plan = PathPlan()
+        paths = []
+        for name in ('changed', 'kept', 'missing', 'replaced'):
+            path = base / 'build' / 'pkg' / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text('content')
+            plan.add(path, ('build', 'pkg'))
+            paths.append(path)
+        plan.add(base / 'install', None)
+        plan_path = base / 'plan.bin'
+        assert plan.save(plan_path) == 4
+
+        changed, kept, missing, replaced = paths
+        st = os.lstat(changed)
+        os.utime(changed, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        missing.unlink()
+        replaced.rename(base / 'other')
+        (base / 'build' / 'pkg' / 'other').write_text('content')
+        (base / 'build' / 'pkg' / 'other').rename(replaced)
+
+        loaded, skipped = PathPlan.load(plan_path)
+        assert list(loaded.items()) == [(kept, ('build', 'pkg'))]
+        assert skipped == 3
+
+        loaded, skipped = PathPlan.load(plan_path, validate=False)
+        assert list(loaded) == paths
+        assert skipped == 0
+
+
+def test_path_plan_load_invalid():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        plan = PathPlan()
+        plan.add(base, ('build', None))
+        plan_path = base / 'plan.bin'
+        plan.save(plan_path)
+        content = plan_path.read_bytes()
+
+        plan_path.write_bytes(content[:len(content) // 2])
+        with pytest.raises(ValueError):
+            PathPlan.load(plan_path)
+        with gzip.open(str(plan_path), 'wt') as h:
+            h.write('["colcon-clean-journal", 1]\n')
+        with pytest.raises(ValueError):
+            PathPlan.load(plan_path)
+        with gzip.open(str(plan_path), 'wt') as h:
+            h.write('{"format": "colcon-clean-plan", "version": 1}\n')
+        with pytest.raises(ValueError, match='Invalid clean plan'):
+            PathPlan.load(plan_path)
+        with gzip.open(str(plan_path), 'wt') as h:
+            h.write(
+                '{"format": "colcon-clean-plan", "version": 1, '
+                '"groups": [["build", null]]}\n')
+            h.write(json.dumps([str(base), [['plan.bin', 1, 0, 0]]]) + '\n')
+        with pytest.raises(ValueError, match='Invalid clean plan'):
+            PathPlan.load(plan_path)
+        plan_path.write_text('plain text')
+        with pytest.raises(OSError):
+            PathPlan.load(plan_path)
+        with pytest.raises(OSError):
+            PathPlan.load(base / 'missing')
+
+
+def test_clean_saved_plan_invalid():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        args = Namespace(plan_in=Path(base) / 'missing')
+        assert clean_saved_plan(args, None) == 1
@@ -0,0 +1,52 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import json
+from pathlib import Path
+import pstats
+from tempfile import TemporaryDirectory
+
+from colcon_clean.clean.profiling import PhaseProfiler
+from colcon_clean.clean.profiling import PROFILE_FILENAME
+from colcon_clean.clean.profiling import TRACE_FILENAME
+
+
+def test_phase_profiler():
+    profiler = PhaseProfiler()
+    with profiler.phase('scan') as phase:
+        phase.paths = 3
+    assert not profiler.enabled
+    assert profiler.phases == []
+
+    profiler = PhaseProfiler('summary')
+    with profiler.phase('scan') as phase:
+        phase.paths = 3
+    with profiler.phase('delete'):
+        pass
+    assert [phase.name for phase in profiler.phases] == ['scan', 'delete']
+    assert profiler.phases[0].paths == 3
+    assert profiler.phases[1].paths is None
+    assert profiler.phases[0].wall >= 0
+    assert profiler.phases[1].start >= profiler.phases[0].start
+
+
+def test_phase_profiler_trace():
+    with TemporaryDirectory(prefix='test_colcon_') as log_path:
+        with PhaseProfiler('trace', log_path=log_path) as profiler:
+            with profiler.phase('scan') as phase:
+                phase.paths = 2
+        with (Path(log_path) / TRACE_FILENAME).open() as h:
+            trace = json.load(h)
+    event, = trace['traceEvents']
+    assert event['name'] == 'scan'
+    assert event['ph'] == 'X'
+    assert event['args']['paths'] == 2
+
+
+def test_phase_profiler_cprofile():
+    with TemporaryDirectory(prefix='test_colcon_') as log_path:
+        with PhaseProfiler('cprofile', log_path=log_path) as profiler:
+            with profiler.phase('scan'):
+                sorted(range(1000))
+        stats = pstats.Stats(str(Path(log_path) / PROFILE_FILENAME))
+    assert stats.total_calls > 0
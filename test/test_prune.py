@@ -0,0 +1,72 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+from argparse import Namespace
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from colcon_clean.event_handler.prune import get_prune_args
+from colcon_clean.event_handler.prune import PruneEventHandler
+from colcon_core.event.job import JobEnded
+from colcon_core.event_reactor import EventReactorShutdown
+from colcon_core.executor import Job
+from colcon_core.package_descriptor import PackageDescriptor
+from colcon_core.task import TaskContext
+from colcon_core.verb.build import BuildPackageArguments
+
+
+def _get_build_job(base, pkg_name):
+    pkg = PackageDescriptor(base / 'src' / pkg_name)
+    pkg.name = pkg_name
+    args = Namespace(
+        build_base=str(base / 'build'), install_base=str(base / 'install'),
+        merge_install=False, symlink_install=False, test_result_base=None)
+    task_context = TaskContext(
+        pkg=pkg, args=BuildPackageArguments(pkg, args), dependencies={})
+    return Job(
+        identifier=pkg_name, dependencies=set(), task=None,
+        task_context=task_context)
+
+
+def test_get_prune_args():
+    args = get_prune_args({
+        'COLCON_CLEAN_PRUNE_MATCH': os.pathsep.join(['*.o', '', '*.a'])})
+    assert args.clean_match == ['*.o', '*.a']
+    assert args.clean_ignore is None
+    args = get_prune_args({})
+    assert args.clean_match is None
+    assert args.clean_ignore is None
+
+
+def test_prune_event_handler(monkeypatch):
+    monkeypatch.delenv('COLCON_CLEAN_PRUNE_MATCH', raising=False)
+    monkeypatch.delenv('COLCON_CLEAN_PRUNE_IGNORE', raising=False)
+    assert not PruneEventHandler().enabled
+
+    monkeypatch.setenv('COLCON_CLEAN_PRUNE_MATCH', '*.o')
+    monkeypatch.setenv('COLCON_CLEAN_PRUNE_IGNORE', 'keep.o')
+    handler = PruneEventHandler()
+    assert handler.enabled
+
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        paths = {}
+        for pkg_name in ('pkg_a', 'pkg_b'):
+            path = base / 'build' / pkg_name
+            (path / 'sub').mkdir(parents=True)
+            for name in ('a.o', 'sub/b.o', 'keep.o', 'CMakeCache.txt'):
+                (path / name).write_text('content')
+            paths[pkg_name] = path
+
+        handler((JobEnded('pkg_a', 0), _get_build_job(base, 'pkg_a')))
+        # failed builds are kept for inspection
+        handler((JobEnded('pkg_b', 1), _get_build_job(base, 'pkg_b')))
+        handler((EventReactorShutdown(), None))
+
+        remaining = {
+            str(path.relative_to(paths['pkg_a']))
+            for path in paths['pkg_a'].rglob('*')}
+        assert remaining == {'sub', 'keep.o', 'CMakeCache.txt'}
+        assert (paths['pkg_b'] / 'a.o').exists()
+        assert (paths['pkg_b'] / 'sub' / 'b.o').exists()
@@ -0,0 +1,119 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from colcon_clean.clean import report
+from colcon_clean.clean.report import format_report
+from colcon_clean.clean.report import format_size
+from colcon_clean.clean.report import get_usage_report
+from colcon_clean.clean.report import summarize_paths
+from colcon_clean.subverb import clean_paths
+
+
+def test_get_usage_report():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        (base / 'build' / 'pkg_a' / 'sub').mkdir(parents=True)
+        (base / 'build' / 'pkg_a' / 'sub' / 'file.txt').write_text('x' * 5000)
+        (base / 'build' / 'pkg_a' / 'link').symlink_to(base / 'build')
+        (base / 'install').mkdir()
+        (base / 'install' / 'file.txt').write_text('content')
+
+        groups = {
+            base / 'build' / 'pkg_a': ('build', 'pkg_a'),
+            base / 'install' / 'file.txt': ('install', None),
+        }
+        report = get_usage_report(
+            list(groups.keys()) + [base / 'missing'], groups=groups,
+            workers=2)
+
+        data = report.to_dict()
+        assert data['total']['paths'] == 3
+        assert data['total']['files'] == 3
+        assert data['bases']['build']['files'] == 2
+        assert data['bases']['build']['bytes'] >= 5000
+        assert data['bases']['build']['packages']['pkg_a']['files'] == 2
+        assert data['bases']['install']['packages'] == {}
+
+        text = format_report(report, dry_run=True)
+        assert text.startswith('Would free:')
+        assert 'pkg_a' in text
+        data = json.loads(format_report(report, report_format='json'))
+        assert data['dry_run'] is False
+        assert data['total']['files'] == 3
+
+
+def test_get_usage_report_split(monkeypatch):
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        for pkg_name in ('pkg_a', 'pkg_b'):
+            (base / 'build' / pkg_name / 'sub').mkdir(parents=True)
+            (base / 'build' / pkg_name / 'sub' / 'file.txt').write_text('x')
+        (base / 'build' / 'file.txt').write_text('x')
+        get_path_usage = report.get_path_usage
+        expected = get_path_usage(base / 'build')
+
+        measured = []
+
+        def measure(path):
+            measured.append(Path(path))
+            return get_path_usage(path)
+
+        monkeypatch.setattr(report, 'get_path_usage', measure)
+        usage_report = get_usage_report(
+            [base / 'build'], groups={base / 'build': ('build', None)},
+            workers=2)
+
+        # the packages of the base are measured separately
+        assert sorted(measured) == [
+            base / 'build' / 'pkg_a', base / 'build' / 'pkg_b']
+        assert usage_report.total.to_dict() == expected.to_dict()
+        assert usage_report.bases['build'].files == 3
+
+
+def test_format_size():
+    assert format_size(512) == '512 B'
+    assert format_size(4096) == '4.0 KiB'
+    assert format_size(3 * 1024 ** 5) == '3072.0 TiB'
+
+
+def test_summarize_paths():
+    base = Path('/ws/build')
+    paths = [
+        base / 'pkg_a' / 'CMakeFiles' / 'a.dir' / 'a.gcda',
+        base / 'pkg_a' / 'CMakeFiles' / 'b.dir' / 'b.gcda',
+        base / 'pkg_a' / 'CMakeFiles' / 'c.gcda',
+        base / 'pkg_b' / 'b.gcda',
+    ]
+    groups = {path: ('build', path.parts[3]) for path in paths}
+    assert summarize_paths(paths, groups=groups) == [
+        (str(base / 'pkg_a' / 'CMakeFiles'), 'build', 'pkg_a', 3),
+        (str(base / 'pkg_b' / 'b.gcda'), 'build', 'pkg_b', 1),
+    ]
+    assert summarize_paths(paths) == [(str(base), None, None, 4)]
+    groups = {path: ('build', None) for path in paths}
+    assert summarize_paths(paths, groups=groups, base_paths=[base]) == [
+        (str(base / 'pkg_a' / 'CMakeFiles'), 'build', None, 3),
+        (str(base / 'pkg_b' / 'b.gcda'), 'build', None, 1),
+    ]
+    assert summarize_paths([]) == []
+
+
+def test_clean_paths_report_file(capsys):
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        (base / 'build').mkdir()
+        (base / 'build' / 'file.txt').write_text('content')
+        report_file = base / 'report.json'
+        clean_paths(
+            [base / 'build'], confirmed=True, workers=1,
+            groups={base / 'build': ('build', None)},
+            report_file=report_file)
+        assert not (base / 'build').exists()
+        data = json.loads(report_file.read_text())
+        assert not data['dry_run']
+        assert data['total']['files'] == 1
+        assert 'dry_run' not in capsys.readouterr().out
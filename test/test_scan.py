@@ -0,0 +1,199 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import datetime
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import threading
+
+from colcon_clean.clean.index import INDEX_DIRNAME
+from colcon_clean.clean.index import ScanIndex
+from colcon_clean.clean.scan import scan_tree
+from colcon_clean.clean.scan import ScanFilter
+
+
+def _create_tree(base):
+    (base / 'pkg' / 'sub').mkdir(parents=True)
+    (base / 'pkg' / 'empty').mkdir()
+    (base / 'pkg' / 'a.py').write_text('content')
+    (base / 'pkg' / 'sub' / 'b.py').write_text('content')
+    (base / 'pkg' / 'sub' / 'c.gcda').write_text('content')
+    (base / '.hidden').write_text('content')
+    (base / 'file_link.py').symlink_to(base / 'pkg' / 'a.py')
+    (base / 'dir_link').symlink_to(base / 'pkg')
+
+
+def test_scan_tree():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        _create_tree(base)
+
+        paths = scan_tree(base, ScanFilter(match=['*.py']))
+        assert sorted(paths) == [
+            base / 'file_link.py',
+            base / 'pkg' / 'a.py',
+            base / 'pkg' / 'sub' / 'b.py',
+        ]
+
+        paths = scan_tree(base, ScanFilter(match=['*', '!.*', '!sub/']))
+        assert sorted(paths) == [
+            base / 'dir_link',
+            base / 'file_link.py',
+            base / 'pkg' / 'a.py',
+        ]
+
+        paths = scan_tree(
+            base, ScanFilter(linked_dirs=False, linked_files=False))
+        assert sorted(paths) == [
+            base / '.hidden',
+            base / 'pkg' / 'a.py',
+            base / 'pkg' / 'sub' / 'b.py',
+            base / 'pkg' / 'sub' / 'c.gcda',
+        ]
+
+
+def test_scan_tree_prunes_covered_directories():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        _create_tree(base)
+
+        paths = scan_tree(base, ScanFilter(match=['*', '!/pkg/sub/*.py']))
+        assert sorted(paths) == [
+            base / '.hidden',
+            base / 'dir_link',
+            base / 'file_link.py',
+            base / 'pkg' / 'a.py',
+            base / 'pkg' / 'empty',
+            base / 'pkg' / 'sub' / 'c.gcda',
+        ]
+
+        paths = scan_tree(base, ScanFilter(match=['sub/']))
+        assert sorted(paths) == [base / 'pkg' / 'sub']
+
+        paths = scan_tree(base, ScanFilter(match=['sub/', '!*.gcda']))
+        assert sorted(paths) == [base / 'pkg' / 'sub' / 'b.py']
+
+
+def test_scan_tree_age_and_size():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        _create_tree(base)
+        (base / 'pkg' / 'core').write_bytes(b'\0' * 4096)
+        now = 100 * 24 * 3600 * 10 ** 9
+        day = 24 * 3600 * 10 ** 9
+        for path, days in (
+            (base / 'pkg' / 'a.py', 30),
+            (base / 'pkg' / 'sub' / 'b.py', 2),
+            (base / 'pkg' / 'core', 20),
+        ):
+            mtime_ns = now - days * day
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+        scan_filter = ScanFilter(
+            linked_dirs=False, linked_files=False,
+            older_than=datetime.timedelta(days=14), now=now)
+        assert not scan_filter.match_dir('pkg')
+        assert sorted(scan_tree(base, scan_filter)) == [
+            base / 'pkg' / 'a.py',
+            base / 'pkg' / 'core',
+        ]
+
+        scan_filter = ScanFilter(
+            match=['*.py'], linked_files=False,
+            newer_than=datetime.timedelta(days=7), now=now)
+        assert sorted(scan_tree(base, scan_filter)) == [
+            base / 'pkg' / 'sub' / 'b.py',
+        ]
+
+        scan_filter = ScanFilter(
+            linked_dirs=False, linked_files=False, larger_than=1024)
+        assert list(scan_tree(base, scan_filter, use_index=True)) == [
+            base / 'pkg' / 'core',
+        ]
+        assert not (base / INDEX_DIRNAME).exists()
+
+
+def test_scan_tree_cancelled():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        _create_tree(base)
+        cancelled = threading.Event()
+        paths = scan_tree(
+            base, ScanFilter(match=['*.gcda']), use_index=True,
+            cancelled=cancelled)
+        cancelled.set()
+        assert list(paths) == []
+        assert not (base / INDEX_DIRNAME).exists()
+
+
+def test_scan_tree_index():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        _create_tree(base)
+        scan_filter = ScanFilter(match=['*.py', '*.gcda'])
+        expected = sorted(scan_tree(base, scan_filter))
+
+        assert sorted(scan_tree(base, scan_filter, use_index=True)) == \
+            expected
+        assert Path(ScanIndex(base, scan_filter.get_key()).path).is_file()
+        assert sorted(scan_tree(base, scan_filter, use_index=True)) == \
+            expected
+
+        # pretend the previous scan happened long after the last changes
+        index = ScanIndex(base, scan_filter.get_key())
+        index.load()
+        index._current = index._previous
+        index._scan_ns += 10 ** 12
+        index.save()
+
+        # unmodified directories are not listed again
+        sub_stat = (base / 'pkg' / 'sub').stat()
+        (base / 'pkg' / 'sub' / 'd.py').write_text('content')
+        os.utime(
+            base / 'pkg' / 'sub',
+            ns=(sub_stat.st_atime_ns, sub_stat.st_mtime_ns))
+        assert sorted(scan_tree(base, scan_filter, use_index=True)) == \
+            expected
+
+        # modified directories are listed again
+        (base / 'pkg' / 'sub' / 'b.py').unlink()
+        expected.remove(base / 'pkg' / 'sub' / 'b.py')
+        expected.append(base / 'pkg' / 'sub' / 'd.py')
+        assert sorted(scan_tree(base, scan_filter, use_index=True)) == \
+            sorted(expected)
+
+        # the index is ignored for a different filter
+        paths = scan_tree(base, ScanFilter(match=['*.gcda']), use_index=True)
+        assert sorted(paths) == [base / 'pkg' / 'sub' / 'c.gcda']
+
+
+def test_scan_tree_index_root(monkeypatch):
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        _create_tree(base)
+        scan_filter = ScanFilter(match=['*.py', '*.gcda'])
+        expected = sorted(scan_tree(base, scan_filter, use_index=True))
+        assert sorted(scan_tree(base, scan_filter, use_index=True)) == \
+            expected
+
+        # saving the index doesn't modify the indexed directory
+        mtime_ns = base.stat().st_mtime_ns
+        index = ScanIndex(base, scan_filter.get_key())
+        index.load()
+        index._current = index._previous
+        index._scan_ns += 10 ** 12
+        index.save()
+        assert base.stat().st_mtime_ns == mtime_ns
+
+        listed = []
+        scandir = os.scandir
+
+        def record(path):
+            listed.append(path)
+            return scandir(path)
+
+        monkeypatch.setattr(os, 'scandir', record)
+        assert sorted(scan_tree(base, scan_filter, use_index=True)) == \
+            expected
+        assert listed == []
@@ -0,0 +1,63 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from colcon_clean.clean import delete
+from colcon_clean.clean.delete import CleanSummary
+from colcon_clean.clean.trash import find_trash_dirs
+from colcon_clean.clean.trash import main
+from colcon_clean.clean.trash import move_paths_to_trash
+from colcon_clean.clean.trash import reap_trash_dir
+from colcon_clean.clean.trash import spawn_reaper
+from colcon_clean.clean.trash import TRASH_DIRNAME
+
+
+def test_move_paths_to_trash():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        (base / 'build' / 'sub').mkdir(parents=True)
+        (base / 'build' / 'sub' / 'file.txt').write_text('content')
+        (base / 'install').mkdir()
+
+        summary = CleanSummary()
+        remaining, trash_dirs = move_paths_to_trash(
+            [base / 'build', base / 'install', base / 'missing'],
+            summary=summary)
+
+        assert remaining == []
+        assert trash_dirs == {base / TRASH_DIRNAME}
+        assert not (base / 'build').exists()
+        assert not (base / 'install').exists()
+        assert len(list((base / TRASH_DIRNAME).iterdir())) == 2
+        assert summary.cleaned == 3
+        assert find_trash_dirs([base]) == trash_dirs
+
+        main([str(trash_dir) for trash_dir in trash_dirs])
+        assert not (base / TRASH_DIRNAME).exists()
+        assert find_trash_dirs([base]) == set()
+
+
+def test_reap_trash_dir_without_fd_functions(monkeypatch):
+    monkeypatch.setattr(delete, '_USE_FD_FUNCTIONS', False)
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        trash_dir = Path(base) / TRASH_DIRNAME
+        (trash_dir / 'build' / 'sub').mkdir(parents=True)
+        (trash_dir / 'build' / 'sub' / 'file.txt').write_text('content')
+        (trash_dir / 'file.txt').write_text('content')
+        reap_trash_dir(str(trash_dir))
+        assert not trash_dir.exists()
+
+
+def test_spawn_reaper():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        trash_dirs = set()
+        for index in range(200):
+            trash_dir = Path(base) / f'{index:0200}' / TRASH_DIRNAME
+            (trash_dir / 'build').mkdir(parents=True)
+            trash_dirs.add(trash_dir)
+        pid = spawn_reaper(trash_dirs)
+        os.waitpid(pid, 0)
+        assert find_trash_dirs(path.parent for path in trash_dirs) == set()
@@ -0,0 +1,69 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+from argparse import Namespace
+from pathlib import Path
+
+from colcon_clean.base_handler.build import BuildBaseHandler
+from colcon_clean.base_handler.install import InstallBaseHandler
+from colcon_clean.base_handler.test_result import TestResultBaseHandler
+from colcon_clean.clean.trie import AncestorMap
+from colcon_clean.clean.trie import normalize_paths
+from colcon_clean.clean.trie import PathTrie
+from colcon_core.package_descriptor import PackageDescriptor
+
+
+def test_path_trie():
+    trie = PathTrie()
+    assert trie.add(Path('/ws/build/pkg_a/CMakeFiles'))
+    assert trie.add(Path('/ws/build/pkg_a/lib'))
+    assert not trie.add(Path('/ws/build/pkg_a/lib'))
+    assert len(trie) == 2
+
+    # a parent replaces the paths below it
+    assert trie.add(Path('/ws/build/pkg_a'))
+    assert len(trie) == 1
+    assert not trie.add(Path('/ws/build/pkg_a/CMakeFiles/a.gcda'))
+    assert list(trie) == [Path('/ws/build/pkg_a')]
+
+    # a sibling sharing the name prefix is not nested
+    assert trie.add(Path('/ws/build/pkg_a_extra'))
+    assert sorted(trie) == [
+        Path('/ws/build/pkg_a'), Path('/ws/build/pkg_a_extra')]
+
+
+def test_normalize_paths_overlapping_bases():
+    pkg = PackageDescriptor('/ws/src/pkg_a')
+    pkg.name = 'pkg_a'
+    args = Namespace(
+        build_base='build', install_base='install',
+        test_result_base='build')
+    paths = []
+    for base_handler in (
+        BuildBaseHandler(), InstallBaseHandler(), TestResultBaseHandler()
+    ):
+        paths += base_handler.get_workspace_paths(args=args)
+        paths += base_handler.get_package_paths(args=args, pkg=pkg)
+    paths = [Path('/ws', path) for path in paths]
+    assert len(paths) == 6
+
+    assert sorted(normalize_paths(paths)) == [
+        Path('/ws/build'), Path('/ws/install')]
+    assert sorted(normalize_paths(
+        path for path in paths if path.name == 'pkg_a'
+    )) == [Path('/ws/build/pkg_a'), Path('/ws/install/pkg_a')]
+
+
+def test_ancestor_map():
+    ancestors = AncestorMap({
+        Path('/ws_a'): 'a',
+        Path('/ws_a/nested'): 'nested',
+        Path('/ws_b'): 'b',
+    })
+    assert ancestors.get(Path('/ws_a')) == 'a'
+    assert ancestors.get(Path('/ws_a/build/pkg/file')) == 'a'
+    assert ancestors.get(Path('/ws_a/build/pkg/other')) == 'a'
+    assert ancestors.get(Path('/ws_a/nested/file')) == 'nested'
+    assert ancestors.get(Path('/ws_b/install')) == 'b'
+    assert ancestors.get(Path('/ws_c/install')) is None
+    assert ancestors.get(Path('/ws_c/install'), 'default') == 'default'
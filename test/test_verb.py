@@ -1,6 +1,8 @@
 # Copyright 2021 Ruffin White
 # Licensed under the Apache License, Version 2.0
 
+import subprocess
+import sys
 from unittest.mock import Mock
 
 from colcon_clean.verb.clean import CleanVerb
@@ -23,6 +25,10 @@ def test_verb_interface():
     rc = interface.main(context=context)
     assert rc == 'Error: No subverb provided'
 
+    context.args.subverb_name = 'orphans'
+    rc = interface.main(context=context)
+    assert rc is None
+
     context.args.subverb_name = 'packages'
     rc = interface.main(context=context)
     assert rc is None
@@ -30,3 +36,11 @@ def test_verb_interface():
     context.args.subverb_name = 'workspace'
     rc = interface.main(context=context)
     assert rc is None
+
+
+def test_verb_import():
+    # the verb module is imported by every colcon invocation
+    subprocess.run([
+        sys.executable, '-c',
+        'import sys; import colcon_clean.verb.clean; '
+        "assert 'colcon_clean.subverb' not in sys.modules"], check=True)
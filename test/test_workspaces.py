@@ -0,0 +1,107 @@
+# Copyright 2021 Ruffin White
+# Licensed under the Apache License, Version 2.0
+
+from argparse import ArgumentParser
+from argparse import Namespace
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from colcon_clean.subverb.workspace import get_workspace_args
+from colcon_clean.subverb.workspace import get_workspace_roots
+from colcon_clean.subverb.workspace import scan_workspaces
+from colcon_clean.subverb.workspace import WorkspaceCleanSubverb
+from colcon_clean.subverb.workspace import WorkspaceResults
+from colcon_core.command import CommandContext
+
+
+def test_get_workspace_roots():
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        for name in ('ws_b', 'ws_a'):
+            (base / name).mkdir()
+        (base / 'ws_file').write_text('content')
+        roots = get_workspace_roots([
+            str(base / 'ws_*'), str(base / 'ws_a'), str(base / 'missing')])
+        assert roots == [base / 'ws_a', base / 'ws_b']
+
+
+def test_get_workspace_args():
+    args = Namespace(
+        build_base='build', install_base='/abs/install', log_base=None,
+        yes=True)
+    workspace_args = get_workspace_args(args, Path('/ws'))
+    assert workspace_args.build_base == str(Path('/ws', 'build'))
+    assert workspace_args.install_base == '/abs/install'
+    assert workspace_args.log_base is None
+    assert workspace_args.yes
+    assert args.build_base == 'build'
+
+
+def test_scan_workspaces(capsys):
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        roots = [base / 'ws_a', base / 'ws_b']
+        workspace_paths = {}
+        for root in roots:
+            for base_name in ('build', 'install'):
+                (root / base_name / 'pkg').mkdir(parents=True)
+                workspace_paths[root / base_name] = (base_name, None)
+        path_plan = scan_workspaces(workspace_paths, None, workers=2)
+        assert sorted(path_plan) == sorted(workspace_paths)
+        assert path_plan.get(base / 'ws_b' / 'install') == ('install', None)
+
+        results = WorkspaceResults(roots)
+        results.add(base / 'ws_a' / 'build', [])
+        results.add(base / 'ws_a' / 'install', [])
+        results.add(
+            base / 'ws_b' / 'build',
+            [(base / 'ws_b' / 'build', OSError('denied'))])
+        results.add(base / 'other', [])
+        results.print_results()
+        lines = capsys.readouterr().out.splitlines()
+        assert lines == [
+            'Workspaces:',
+            f"    '{roots[0]}': cleaned 2 paths",
+            f"    '{roots[1]}': cleaned 0 paths with 1 errors",
+        ]
+
+
+def test_workspace_summary_by_package(capsys, monkeypatch):
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        monkeypatch.chdir(base)
+        for pkg_name in ('pkg_a', 'pkg_b'):
+            (Path('build') / pkg_name).mkdir(parents=True)
+            for i in range(60):
+                (Path('build') / pkg_name / f'{i}.gcda').write_text('')
+        subverb = WorkspaceCleanSubverb()
+        parser = ArgumentParser()
+        subverb.add_arguments(parser=parser)
+        args = parser.parse_args([
+            '--dry-run', '--base-select', 'build',
+            '--clean-match', '*.gcda'])
+        context = CommandContext(command_name='clean', args=args)
+        assert subverb.main(context=context) == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[:3] == [
+            'Paths:',
+            f"     {Path('build', 'pkg_a')} (60 paths)",
+            f"     {Path('build', 'pkg_b')} (60 paths)",
+        ]
+
+
+def test_workspaces_keep_cwd(monkeypatch):
+    with TemporaryDirectory(prefix='test_colcon_') as base:
+        base = Path(base)
+        (base / 'cwd').mkdir()
+        (base / 'ws_a' / 'build' / 'pkg').mkdir(parents=True)
+        monkeypatch.chdir(base / 'cwd')
+        subverb = WorkspaceCleanSubverb()
+        parser = ArgumentParser()
+        subverb.add_arguments(parser=parser)
+        args = parser.parse_args([
+            '--yes', '--base-select', 'build',
+            '--workspaces', str(base / 'ws_*')])
+        context = CommandContext(command_name='clean', args=args)
+        assert subverb.main(context=context) == 0
+        assert not (base / 'ws_a' / 'build').exists()
+        assert list((base / 'cwd').iterdir()) == []